@@ -4,23 +4,114 @@ Implements Reasoning + Acting loop with live streaming and intelligent summaries
 """
 
 import streamlit as st
-import json
-import requests
-from typing import Any, Dict, List, Optional, Tuple, Generator
-from dataclasses import dataclass, asdict, field
+import asyncio
+import aiohttp
+import orjson
+from typing import Any, AsyncGenerator, Callable, Dict, FrozenSet, Generator, List, Optional, Tuple
+from dataclasses import dataclass, field
 from datetime import datetime
 import logging
 from enum import Enum
-from langchain_core.messages import HumanMessage
-from langchain_openai import ChatOpenAI
+from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+import hashlib
+import io
+import math
+import operator
 import re
+import sys
 import time
-from queue import Queue
+import uuid
+import weakref
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Bump whenever the ReAct/summary prompt format changes so stale cached responses are ignored
+PROMPT_TEMPLATE_VERSION = "3"
+
+# Upper bound on concurrent service calls fanned out from one EXECUTE_SERVICES action
+MAX_PARALLEL_SERVICE_CALLS = 32
+
+# Streamed events are coalesced into batches of at most this age (seconds) for the UI (~30fps)
+EVENT_BATCH_INTERVAL = 0.033
+# Event types that flush the pending batch immediately
+_FLUSH_EVENT_TYPES = frozenset({"final_answer", "error", "step_completed"})
+
+# The executor UI redraws at most this often (seconds), except for the event types below
+RENDER_INTERVAL = 1 / 30
+_FORCE_RENDER_EVENT_TYPES = frozenset({"final_answer", "error", "summary"})
+# Action/observation payloads larger than this (bytes of JSON) are previewed, not inlined in full
+PAYLOAD_PREVIEW_BYTES = 2048
+# Elapsed-time / services-called metrics refresh at most this often (seconds)
+METRIC_INTERVAL = 0.1
+
+# List responses are truncated to this many items at ingest to keep summary prompts bounded
+MAX_LIST_ITEMS = 50
+
+# ReAct response parsing: one combined pass, with per-field fallbacks for partial responses
+_REACT_RE = re.compile(
+    r'Thought:\s*(?P<thought>.+?)\s*Action:\s*(?P<action>.+?)\s*Action Input:\s*(?P<input>\{.+?\})\s*$',
+    re.DOTALL
+)
+_THOUGHT_RE = re.compile(r'Thought:\s*(.+?)(?=Action:|$)', re.DOTALL)
+_ACTION_RE = re.compile(r'Action:\s*(.+?)(?=Action Input:|$)', re.DOTALL)
+_ACTION_INPUT_RE = re.compile(r'Action Input:\s*(\{.+?\})', re.DOTALL)
+
+
+def _dumps(obj: Any) -> str:
+    """Pretty-print an object as JSON (orjson; non-JSON types fall back to str)"""
+    return orjson.dumps(
+        obj,
+        option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS,
+        default=str
+    ).decode()
+
+
+def _new_event_loop() -> asyncio.AbstractEventLoop:
+    """Create an event loop, preferring uvloop on Linux when it is installed"""
+    if sys.platform == "linux":
+        try:
+            import uvloop
+            return uvloop.new_event_loop()
+        except ImportError:
+            pass
+    return asyncio.new_event_loop()
+
+
+def _result_key(service_name: str, params: Dict[str, Any]) -> str:
+    """Key for one service call's result: the service name, qualified by its params when it has any"""
+    if not params:
+        return service_name
+    return f"{service_name} {orjson.dumps(params, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS, default=str).decode()}"
+
+
+def _shutdown_agent_loop(loop: asyncio.AbstractEventLoop, service_manager: "ServiceManager") -> None:
+    """Close the service manager's aiohttp session on the loop that opened it, then the loop"""
+    if loop.is_closed():
+        return
+    try:
+        loop.run_until_complete(service_manager.close())
+        loop.run_until_complete(loop.shutdown_asyncgens())
+    finally:
+        loop.close()
+
+
+def _prune(obj: Any) -> Any:
+    """Recursively drop null/empty fields from a JSON-like structure"""
+    if isinstance(obj, dict):
+        pruned = {k: _prune(v) for k, v in obj.items()}
+        return {k: v for k, v in pruned.items() if v not in (None, "", [], {})}
+    if isinstance(obj, list):
+        return [v for v in map(_prune, obj) if v not in (None, "", [], {})]
+    return obj
+
+
+def _compact(obj: Any) -> str:
+    """Serialize pruned data as compact JSON for LLM consumption (no indentation)"""
+    return orjson.dumps(_prune(obj), option=orjson.OPT_NON_STR_KEYS, default=str).decode()
+
 # ============================================================================
 # ENUMS & DATA MODELS
 # ============================================================================
@@ -36,12 +127,13 @@ class StepType(Enum):
 class ActionType(Enum):
     """Type of action to perform"""
     EXECUTE_SERVICE = "execute_service"
+    EXECUTE_SERVICES = "execute_services"
     ANALYZE_RESULT = "analyze_result"
     COMBINE_RESULTS = "combine_results"
     EXTRACT_PARAMS = "extract_params"
 
 
-@dataclass
+@dataclass(slots=True)
 class StreamEvent:
     """Event to stream to UI"""
     event_type: str
@@ -49,7 +141,11 @@ class StreamEvent:
     step_type: Optional[str] = None
     content: Optional[str] = None
     data: Optional[Dict[str, Any]] = None
-    timestamp: str = field(default_factory=lambda: datetime.now().isoformat())
+    timestamp: float = field(default_factory=time.time)
+
+    @property
+    def timestamp_iso(self) -> str:
+        return datetime.fromtimestamp(self.timestamp).isoformat()
 
     def to_dict(self):
         return {
@@ -58,11 +154,11 @@ class StreamEvent:
             "step_type": self.step_type,
             "content": self.content,
             "data": self.data,
-            "timestamp": self.timestamp
+            "timestamp": self.timestamp_iso
         }
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ServiceConfig:
     """Configuration for a REST service"""
     id: str
@@ -74,30 +170,48 @@ class ServiceConfig:
     output_params: List[str]
     headers: Optional[Dict[str, str]] = None
     auth_token: Optional[str] = None
+    # Hashed views of the param lists for O(1) membership tests while filtering
+    _input_set: FrozenSet[str] = field(init=False, repr=False, compare=False)
+    _output_set: FrozenSet[str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "_input_set", frozenset(self.input_params))
+        object.__setattr__(self, "_output_set", frozenset(self.output_params))
 
     def to_dict(self):
-        return asdict(self)
+        # Shallow copy: every field is a scalar or a flat container, so asdict's recursive deepcopy is wasted work
+        return {
+            "id": self.id,
+            "name": self.name,
+            "url": self.url,
+            "http_type": self.http_type,
+            "description": self.description,
+            "input_params": list(self.input_params),
+            "output_params": list(self.output_params),
+            "headers": dict(self.headers) if self.headers is not None else None,
+            "auth_token": self.auth_token
+        }
 
     @classmethod
     def from_dict(cls, data):
         return cls(**data)
 
 
-@dataclass
+@dataclass(slots=True)
 class ExecutionResult:
     """Result of service execution"""
     service_name: str
     status: str
     data: Any
     error: Optional[str] = None
-    timestamp: str = None
+    timestamp: float = field(default_factory=time.time)
 
-    def __post_init__(self):
-        if self.timestamp is None:
-            self.timestamp = datetime.now().isoformat()
+    @property
+    def timestamp_iso(self) -> str:
+        return datetime.fromtimestamp(self.timestamp).isoformat()
 
 
-@dataclass
+@dataclass(slots=True)
 class OrchestrationStep:
     """Single step in the orchestration process"""
     step_number: int
@@ -107,9 +221,13 @@ class OrchestrationStep:
     action: Optional[Dict[str, Any]] = None
     observation: Optional[Dict[str, Any]] = None
     result: Optional[Any] = None
-    timestamp: str = field(default_factory=lambda: datetime.now().isoformat())
+    timestamp: float = field(default_factory=time.time)
     status: str = "pending"
 
+    @property
+    def timestamp_iso(self) -> str:
+        return datetime.fromtimestamp(self.timestamp).isoformat()
+
     def to_dict(self):
         return {
             "step_number": self.step_number,
@@ -119,12 +237,12 @@ class OrchestrationStep:
             "action": self.action,
             "observation": self.observation,
             "result": self.result,
-            "timestamp": self.timestamp,
+            "timestamp": self.timestamp_iso,
             "status": self.status
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class OrchestrationTrace:
     """Complete trace of orchestration execution"""
     user_prompt: str
@@ -135,11 +253,21 @@ class OrchestrationTrace:
     execution_time: float = 0.0
     status: str = "pending"
     error: Optional[str] = None
+    trace_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    completed_steps: int = 0
 
     def add_step(self, step: OrchestrationStep):
         """Add a step to the trace"""
         self.steps.append(step)
         self.total_steps = len(self.steps)
+        if step.status == "completed":
+            self.completed_steps += 1
+
+    def complete_step(self, step: OrchestrationStep):
+        """Mark a step of this trace completed, keeping completed_steps in sync"""
+        if step.status != "completed":
+            step.status = "completed"
+            self.completed_steps += 1
 
     def to_dict(self):
         return {
@@ -163,40 +291,136 @@ class ServiceManager:
 
     def __init__(self):
         self.services: Dict[str, ServiceConfig] = {}
+        self._by_name: Dict[str, ServiceConfig] = {}
+        self._version = 0
+        self._aio_session: Optional[aiohttp.ClientSession] = None
+        self._aio_session_loop: Optional[asyncio.AbstractEventLoop] = None
+        # Column-oriented view of the catalog for table rendering, keyed by version
+        self._table: Tuple[int, Dict[str, List[Any]]] = (-1, {})
 
     def add_service(self, config: ServiceConfig):
         """Add a service configuration"""
+        previous = self.services.get(config.id)
+        if previous is not None:
+            self._by_name.pop(previous.name.lower(), None)
         self.services[config.id] = config
+        self._by_name[config.name.lower()] = config
+        self._version += 1
         logger.info(f"Service added: {config.name}")
 
     def remove_service(self, service_id: str):
         """Remove a service configuration"""
         if service_id in self.services:
-            del self.services[service_id]
+            removed = self.services.pop(service_id)
+            if self._by_name.get(removed.name.lower()) is removed:
+                del self._by_name[removed.name.lower()]
+            self._version += 1
             logger.info(f"Service removed: {service_id}")
 
+    @property
+    def version(self) -> int:
+        """Counter bumped on every catalog mutation"""
+        return self._version
+
     def get_service(self, service_id: str) -> Optional[ServiceConfig]:
         """Get a service by ID"""
         return self.services.get(service_id)
 
+    @property
+    def count(self) -> int:
+        """Number of configured services"""
+        return len(self.services)
+
     def list_services(self) -> List[ServiceConfig]:
         """List all services"""
         return list(self.services.values())
 
-    def get_service_by_name(self, name: str) -> Optional[ServiceConfig]:
-        """Get a service by name"""
-        for service in self.services.values():
-            if service.name.lower() == name.lower():
-                return service
-        return None
+    def get_table(self) -> Dict[str, List[Any]]:
+        """Catalog as parallel columns (one list per field), rebuilt only after a mutation"""
+        version, table = self._table
+        if version == self._version:
+            return table
+
+        services = self.services.values()
+        table = {
+            "id": [s.id for s in services],
+            "name": [s.name for s in services],
+            "url": [s.url for s in services],
+            "http_type": [s.http_type for s in services],
+            "description": [s.description for s in services],
+            "input_params": [", ".join(s.input_params) for s in services],
+            "output_params": [", ".join(s.output_params) for s in services],
+        }
+        self._table = (self._version, table)
+        return table
 
-    def execute_service(
+    def get_service_by_name(self, name: str) -> Optional[ServiceConfig]:
+        """Get a service by name (case-insensitive)"""
+        return self._by_name.get(name.lower())
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Get the shared aiohttp session, opening it lazily on the running loop"""
+        loop = asyncio.get_running_loop()
+        if self._aio_session is None or self._aio_session.closed or self._aio_session_loop is not loop:
+            self._aio_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit_per_host=64)
+            )
+            self._aio_session_loop = loop
+        return self._aio_session
+
+    async def close(self):
+        """Close the shared aiohttp session"""
+        if self._aio_session is not None and not self._aio_session.closed:
+            await self._aio_session.close()
+        self._aio_session = None
+        self._aio_session_loop = None
+
+    def _build_headers(self, service: ServiceConfig) -> Dict[str, str]:
+        """Build request headers for a service"""
+        headers = dict(service.headers or {})
+        if service.auth_token:
+            headers["Authorization"] = f"Bearer {service.auth_token}"
+        return headers
+
+    def _filter_output(self, service: ServiceConfig, data: Any) -> Any:
+        """
+        Keep only the configured output parameters of a response, capping list length.
+        A capped list is wrapped with its original length so the model knows rows are missing.
+        """
+        if isinstance(data, list) and len(data) > MAX_LIST_ITEMS:
+            return {
+                "items": self._select_outputs(service, data[:MAX_LIST_ITEMS]),
+                "truncated": True,
+                "total_items": len(data)
+            }
+        return self._select_outputs(service, data)
+
+    def _select_outputs(self, service: ServiceConfig, data: Any) -> Any:
+        """Project a response (object or list of objects) onto the configured output parameters"""
+        if not service.output_params or data is None:
+            return data
+        if isinstance(data, list):
+            keys = tuple(service.output_params)
+            getter = operator.itemgetter(*keys)
+            try:
+                # Fast path: key selection happens in C when every row has every key
+                if len(keys) == 1:
+                    return [{keys[0]: getter(item)} for item in data]
+                return [dict(zip(keys, getter(item))) for item in data]
+            except (KeyError, TypeError):
+                return [
+                    {k: v for k, v in item.items() if k in service._output_set}
+                    for item in data
+                ]
+        return {k: v for k, v in data.items() if k in service._output_set}
+
+    async def execute_service_async(
         self,
         service_id: str,
         params: Dict[str, Any],
         timeout: int = 10
     ) -> ExecutionResult:
-        """Execute a service with given parameters"""
+        """Execute a service with given parameters without blocking the event loop"""
         service = self.get_service(service_id)
         if not service:
             return ExecutionResult(
@@ -206,60 +430,148 @@ class ServiceManager:
                 error=f"Service {service_id} not found"
             )
 
-        try:
-            url = service.url
-            headers = service.headers or {}
-
-            if service.auth_token:
-                headers["Authorization"] = f"Bearer {service.auth_token}"
-
-            if service.http_type == "GET":
-                query_params = {k: v for k, v in params.items() if k in service.input_params}
-                response = requests.get(url, params=query_params, headers=headers, timeout=timeout)
-            elif service.http_type == "POST":
-                response = requests.post(url, json=params, headers=headers, timeout=timeout)
-            elif service.http_type == "PUT":
-                response = requests.put(url, json=params, headers=headers, timeout=timeout)
-            elif service.http_type == "DELETE":
-                response = requests.delete(url, headers=headers, timeout=timeout)
-            else:
-                return ExecutionResult(
-                    service_name=service.name,
-                    status="error",
-                    data=None,
-                    error=f"Unsupported HTTP method: {service.http_type}"
-                )
+        if service.http_type not in ("GET", "POST", "PUT", "DELETE"):
+            return ExecutionResult(
+                service_name=service.name,
+                status="error",
+                data=None,
+                error=f"Unsupported HTTP method: {service.http_type}"
+            )
 
-            response.raise_for_status()
-            data = response.json()
+        request_kwargs: Dict[str, Any] = {
+            "headers": self._build_headers(service),
+            "timeout": aiohttp.ClientTimeout(total=timeout)
+        }
+        if service.http_type == "GET":
+            request_kwargs["params"] = {k: v for k, v in params.items() if k in service._input_set}
+        elif service.http_type in ("POST", "PUT"):
+            request_kwargs["json"] = params
 
-            if service.output_params:
-                if isinstance(data, list):
-                    filtered_data = [
-                        {k: v for k, v in item.items() if k in service.output_params}
-                        for item in data
-                    ]
-                else:
-                    filtered_data = {k: v for k, v in data.items() if k in service.output_params}
-            else:
-                filtered_data = data
+        try:
+            session = await self._get_session()
+            async with session.request(service.http_type, service.url, **request_kwargs) as response:
+                response.raise_for_status()
+                body = await response.read()
+                data = orjson.loads(body) if body else None
 
             return ExecutionResult(
                 service_name=service.name,
                 status="success",
-                data=filtered_data
+                data=self._filter_output(service, data)
             )
 
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Service execution failed: {str(e)}")
+        except (aiohttp.ClientError, asyncio.TimeoutError, orjson.JSONDecodeError) as e:
+            logger.error(f"Service execution failed: {str(e) or type(e).__name__}")
             return ExecutionResult(
                 service_name=service.name,
                 status="error",
                 data=None,
-                error=str(e)
+                error=str(e) or type(e).__name__
             )
 
 
+# ============================================================================
+# SEMANTIC RESPONSE CACHE
+# ============================================================================
+
+# Tokens that carry concrete values (IDs, numbers); a semantic hit must agree on all of them
+_LITERAL_TOKEN = re.compile(r"\w*\d\w*")
+
+
+class SemanticCache:
+    """
+    Caches LLM responses keyed on prompt embeddings, so repeated and
+    paraphrased prompts are answered without another LLM round-trip.
+    Only the dynamic part of a prompt is embedded; the static prefix
+    partitions the cache by exact hash.
+
+    Similarity matching is opt-in per lookup and meant for the bare user
+    request only. Prompts that embed service data (observations, collected
+    results) must use exact keys: near-identical embeddings there can differ
+    in exactly the values that matter. Even for requests, a semantic hit also
+    requires the same ID/number tokens, so "user 1" never answers "user 2".
+    """
+
+    def __init__(
+        self,
+        embeddings: OpenAIEmbeddings,
+        threshold: float = 0.95,
+        ttl_seconds: float = 7 * 24 * 3600,
+        template_version: str = PROMPT_TEMPLATE_VERSION,
+        max_entries: int = 512
+    ):
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.template_version = template_version
+        self.max_entries = max_entries
+        self._exact: Dict[str, Tuple[str, float]] = {}
+        # (namespace, embedding, literal tokens, response, stored_at)
+        self._entries: List[Tuple[str, List[float], FrozenSet[str], str, float]] = []
+
+    def _key(self, prompt: str, prefix: str = "") -> str:
+        return hashlib.sha256(f"{self.template_version}\x00{prefix}\x00{prompt}".encode()).hexdigest()
+
+    def _embed(self, prompt: str) -> List[float]:
+        vector = self.embeddings.embed_query(prompt)
+        norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+        return [x / norm for x in vector]
+
+    def _evict_expired(self, now: float):
+        cutoff = now - self.ttl_seconds
+        self._entries = [entry for entry in self._entries if entry[4] >= cutoff]
+        self._exact = {k: v for k, v in self._exact.items() if v[1] >= cutoff}
+
+    async def lookup(
+        self, prompt: str, prefix: str = "", semantic: bool = False
+    ) -> Tuple[Optional[str], Optional[List[float]]]:
+        """
+        Return (cached response or None, prompt embedding for a later store).
+        Without semantic, only an exact prompt match hits and nothing is embedded.
+        The embedding call blocks, so it runs in a worker thread.
+        """
+        now = time.time()
+        exact = self._exact.get(self._key(prompt, prefix))
+        if exact and now - exact[1] < self.ttl_seconds:
+            return exact[0], None
+        if not semantic:
+            return None, None
+
+        try:
+            embedding = await asyncio.to_thread(self._embed, prompt)
+        except Exception as e:
+            logger.warning(f"Embedding failed, bypassing semantic cache: {str(e)}")
+            return None, None
+
+        self._evict_expired(now)
+        namespace = self._key("", prefix)
+        literals = frozenset(_LITERAL_TOKEN.findall(prompt))
+        best_score, best_response = 0.0, None
+        for entry_namespace, cached_embedding, entry_literals, response, _ in self._entries:
+            if entry_namespace != namespace or entry_literals != literals:
+                continue
+            score = sum(map(operator.mul, embedding, cached_embedding))
+            if score > best_score:
+                best_score, best_response = score, response
+
+        if best_score >= self.threshold:
+            logger.info(f"Semantic cache hit (similarity={best_score:.3f})")
+            return best_response, embedding
+        return None, embedding
+
+    def store(self, prompt: str, embedding: Optional[List[float]], response: str, prefix: str = ""):
+        """Store a response under the prompt's exact key and embedding"""
+        now = time.time()
+        self._exact[self._key(prompt, prefix)] = (response, now)
+        if embedding is not None:
+            literals = frozenset(_LITERAL_TOKEN.findall(prompt))
+            self._entries.append((self._key("", prefix), embedding, literals, response, now))
+        if len(self._entries) > self.max_entries:
+            self._entries = self._entries[-self.max_entries:]
+        if len(self._exact) > self.max_entries:
+            self._exact = dict(list(self._exact.items())[-self.max_entries:])
+
+
 # ============================================================================
 # STREAMING REACT AGENT WITH SUMMARIZATION
 # ============================================================================
@@ -271,91 +583,165 @@ class StreamingReactServiceAgent:
 
     def __init__(self, service_manager: ServiceManager, api_key: str, max_steps: int = 10):
         self.service_manager = service_manager
+        self.api_key = api_key
         self.llm = ChatOpenAI(
             model="gpt-4",
             api_key=api_key,
             temperature=0
         )
+        self.cache = SemanticCache(
+            OpenAIEmbeddings(model="text-embedding-3-small", api_key=api_key)
+        )
         self.max_steps = max_steps
         self.current_trace: Optional[OrchestrationTrace] = None
+        # Keyed per call (service name plus params), so repeated calls to one service all reach the summary
         self.execution_results: Dict[str, ExecutionResult] = {}
-        self.event_queue: Queue = Queue()
+        # Events raised from inside awaited helpers; drained by process_prompt_streaming
+        self.event_queue: asyncio.Queue = asyncio.Queue()
+        self._services_desc: Tuple[int, str] = (-1, "")
+        # Long-lived loop so the service manager's aiohttp session survives across steps
+        self._loop = _new_event_loop()
+        # Streamlit has no session-end hook, so release the session when the agent is collected
+        self._finalizer = weakref.finalize(self, _shutdown_agent_loop, self._loop, service_manager)
+
+    def close(self):
+        """Close the pooled HTTP session and the agent's event loop"""
+        self._finalizer()
+
+    def set_api_key(self, api_key: str):
+        """
+        Rebind the OpenAI clients to a new key, keeping the event loop,
+        HTTP sessions and cached responses of this agent
+        """
+        if api_key == self.api_key:
+            return
+        self.api_key = api_key
+        self.llm = ChatOpenAI(
+            model="gpt-4",
+            api_key=api_key,
+            temperature=0
+        )
+        self.cache.embeddings = OpenAIEmbeddings(model="text-embedding-3-small", api_key=api_key)
 
     def _emit_event(self, event: StreamEvent):
-        """Emit an event to the stream"""
-        self.event_queue.put(event)
-        logger.info(f"Event emitted: {event.event_type} - Step {event.step_number}")
+        """Queue an event raised by a helper for the stream to pick up"""
+        self.event_queue.put_nowait(event)
+
+    def _drain_events(self) -> Generator[StreamEvent, None, None]:
+        """Pop every event queued by helpers so far"""
+        while not self.event_queue.empty():
+            event = self.event_queue.get_nowait()
+            logger.info(f"Event emitted: {event.event_type} - Step {event.step_number}")
+            yield event
+
+    async def _cached_stream(
+        self, static_prefix: str, dynamic_suffix: str, semantic: bool = False
+    ) -> AsyncGenerator[str, None]:
+        """
+        Stream LLM output chunks, answering from the response cache when possible.
+        The static prefix is sent as a leading system message so the provider
+        can reuse its prompt cache across steps. Pass semantic=True only when the
+        suffix is just the user's request (see SemanticCache).
+        """
+        cached, embedding = await self.cache.lookup(dynamic_suffix, prefix=static_prefix, semantic=semantic)
+        if cached is not None:
+            yield cached
+            return
+
+        chunks = []
+        async for chunk in self.llm.astream([
+            SystemMessage(content=static_prefix),
+            HumanMessage(content=dynamic_suffix)
+        ]):
+            if chunk.content:
+                chunks.append(chunk.content)
+                yield chunk.content
+        self.cache.store(dynamic_suffix, embedding, "".join(chunks), prefix=static_prefix)
 
     def _get_services_description(self) -> str:
-        """Get formatted description of all available services"""
+        """Get formatted description of all available services, rebuilt only when the catalog changes"""
+        version = self.service_manager.version
+        if self._services_desc[0] == version:
+            return self._services_desc[1]
+
         services = self.service_manager.list_services()
         if not services:
-            return "No services available"
-
-        services_info = []
-        for service in services:
-            info = f"""
-Service Name: {service.name}
-Description: {service.description}
-URL: {service.url}
-HTTP Method: {service.http_type}
-Input Parameters: {', '.join(service.input_params)}
-Output Parameters: {', '.join(service.output_params)}
-"""
-            services_info.append(info)
-
-        return "\n".join(services_info)
-
-    def _create_react_prompt(self, user_prompt: str, observations: str = "") -> str:
-        """Create ReAct prompt for the agent"""
+            desc = "No services available"
+        else:
+            desc = "".join([
+                f"\nService Name: {service.name}"
+                f"\nDescription: {service.description}"
+                f"\nURL: {service.url}"
+                f"\nHTTP Method: {service.http_type}"
+                f"\nInput Parameters: {', '.join(service.input_params)}"
+                f"\nOutput Parameters: {', '.join(service.output_params)}\n"
+                for service in services
+            ])
+
+        self._services_desc = (version, desc)
+        return desc
+
+    def _create_static_prompt(self) -> str:
+        """
+        Create the static ReAct prompt (persona, services, format spec).
+        Built once per trace; it only changes when the service catalog does,
+        keeping it byte-identical across steps for provider-side prefix caching.
+        """
         services_desc = self._get_services_description()
 
-        prompt = f"""You are an intelligent service orchestration agent using ReAct (Reasoning + Acting) pattern.
+        static_prefix = f"""You are an intelligent service orchestration agent using ReAct (Reasoning + Acting) pattern.
 
 Your task is to help the user by orchestrating calls to available services.
 
 Available Services:
 {services_desc}
 
-User Request: {user_prompt}
-
-{observations}
-
 You must follow this format strictly:
 
 Thought: [Your reasoning about what to do next]
-Action: [The action to take - either EXECUTE_SERVICE, ANALYZE_RESULT, or FINAL_ANSWER]
+Action: [The action to take - either EXECUTE_SERVICE, EXECUTE_SERVICES, ANALYZE_RESULT, or FINAL_ANSWER]
 Action Input: [JSON with details about the action]
 
 If Action is EXECUTE_SERVICE:
   Action Input should be: {{"service_name": "...", "params": {{...}}}}
 
+If Action is EXECUTE_SERVICES:
+  Action Input should be: {{"calls": [{{"service_name": "...", "params": {{...}}}}, ...]}}
+
 If Action is ANALYZE_RESULT:
   Action Input should be: {{"analysis": "..."}}
 
 If Action is FINAL_ANSWER:
   Action Input should be: {{"answer": "..."}}
 
-Think step by step. Execute services one at a time. After each service execution, analyze the result before deciding next steps.
+Think step by step. When several services are needed and none of them depends on another's output, call them together with EXECUTE_SERVICES. Otherwise execute services one at a time. After each service execution, analyze the result before deciding next steps.
 """
-        return prompt
+        return static_prefix
 
     def _parse_agent_response(self, response: str) -> Tuple[Optional[str], Optional[str], Optional[Dict[str, Any]]]:
         """Parse agent response to extract thought, action, and action input"""
         try:
-            thought_match = re.search(r'Thought:\s*(.+?)(?=Action:|$)', response, re.DOTALL)
-            thought = thought_match.group(1).strip() if thought_match else None
+            match = _REACT_RE.search(response)
+            if match:
+                thought = match.group("thought").strip()
+                action = match.group("action").strip()
+                raw_input = match.group("input")
+            else:
+                thought_match = _THOUGHT_RE.search(response)
+                thought = thought_match.group(1).strip() if thought_match else None
+
+                action_match = _ACTION_RE.search(response)
+                action = action_match.group(1).strip() if action_match else None
 
-            action_match = re.search(r'Action:\s*(.+?)(?=Action Input:|$)', response, re.DOTALL)
-            action = action_match.group(1).strip() if action_match else None
+                action_input_match = _ACTION_INPUT_RE.search(response)
+                raw_input = action_input_match.group(1) if action_input_match else None
 
-            action_input_match = re.search(r'Action Input:\s*(\{.+?\})', response, re.DOTALL)
             action_input = None
-            if action_input_match:
+            if raw_input is not None:
                 try:
-                    action_input = json.loads(action_input_match.group(1))
-                except json.JSONDecodeError:
-                    action_input = {"raw": action_input_match.group(1)}
+                    action_input = orjson.loads(raw_input)
+                except orjson.JSONDecodeError:
+                    action_input = {"raw": raw_input}
 
             return thought, action, action_input
 
@@ -363,7 +749,7 @@ Think step by step. Execute services one at a time. After each service execution
             logger.error(f"Error parsing agent response: {str(e)}")
             return None, None, None
 
-    def _execute_action(self, action: str, action_input: Dict[str, Any], step_number: int) -> Dict[str, Any]:
+    async def _execute_action(self, action: str, action_input: Dict[str, Any], step_number: int) -> Dict[str, Any]:
         """Execute the action specified by the agent"""
         try:
             if action == "EXECUTE_SERVICE":
@@ -384,8 +770,8 @@ Think step by step. Execute services one at a time. After each service execution
                         "error": f"Service '{service_name}' not found"
                     }
 
-                result = self.service_manager.execute_service(service.id, params)
-                self.execution_results[service_name] = result
+                result = await self.service_manager.execute_service_async(service.id, params)
+                self.execution_results[_result_key(service_name, params)] = result
 
                 return {
                     "status": result.status,
@@ -394,6 +780,51 @@ Think step by step. Execute services one at a time. After each service execution
                     "error": result.error
                 }
 
+            elif action == "EXECUTE_SERVICES":
+                calls = action_input.get("calls", [])
+
+                self._emit_event(StreamEvent(
+                    event_type="action",
+                    step_number=step_number,
+                    content=f"Executing {len(calls)} services in parallel",
+                    data={"calls": calls}
+                ))
+
+                semaphore = asyncio.Semaphore(MAX_PARALLEL_SERVICE_CALLS)
+
+                async def run_call(call: Dict[str, Any]) -> Dict[str, Any]:
+                    service_name = call.get("service_name")
+                    service = self.service_manager.get_service_by_name(service_name) if service_name else None
+                    if not service:
+                        return {
+                            "status": "error",
+                            "service": service_name,
+                            "error": f"Service '{service_name}' not found"
+                        }
+
+                    params = call.get("params", {})
+                    async with semaphore:
+                        result = await self.service_manager.execute_service_async(service.id, params)
+                    self.execution_results[_result_key(service_name, params)] = result
+
+                    return {
+                        "status": result.status,
+                        "service": result.service_name,
+                        "data": result.data,
+                        "error": result.error
+                    }
+
+                outcomes = await asyncio.gather(*(run_call(call) for call in calls), return_exceptions=True)
+                results = [
+                    {"status": "error", "error": str(outcome)} if isinstance(outcome, Exception) else outcome
+                    for outcome in outcomes
+                ]
+
+                return {
+                    "status": "success" if results and all(r["status"] == "success" for r in results) else "error",
+                    "results": results
+                }
+
             elif action == "ANALYZE_RESULT":
                 analysis = action_input.get("analysis", "")
                 self._emit_event(StreamEvent(
@@ -433,8 +864,12 @@ Think step by step. Execute services one at a time. After each service execution
                 "error": str(e)
             }
 
-    def _generate_summary(self, user_prompt: str, execution_results: Dict[str, ExecutionResult]) -> str:
-        """Generate AI-powered summary of all collected data"""
+    async def _generate_summary(
+        self,
+        user_prompt: str,
+        execution_results: Dict[str, ExecutionResult]
+    ) -> AsyncGenerator[str, None]:
+        """Stream an AI-powered summary of all collected data"""
         try:
             # Prepare data for summarization
             collected_data = {}
@@ -443,14 +878,10 @@ Think step by step. Execute services one at a time. After each service execution
                     collected_data[service_name] = result.data
 
             if not collected_data:
-                return "No data was collected from services."
-
-            summary_prompt = f"""You are a helpful assistant that summarizes data collected from multiple services.
+                yield "No data was collected from services."
+                return
 
-User's Original Request: {user_prompt}
-
-Data Collected from Services:
-{json.dumps(collected_data, indent=2, default=str)}
+            summary_instructions = """You are a helpful assistant that summarizes data collected from multiple services.
 
 Please provide a comprehensive, well-structured summary that:
 1. Directly answers the user's request
@@ -463,27 +894,34 @@ Please provide a comprehensive, well-structured summary that:
 
 Format the response in markdown for better readability. Use headers, bold text, and lists to make it visually appealing."""
 
-            response = self.llm.invoke([HumanMessage(content=summary_prompt)])
-            return response.content
+            summary_request = f"""User's Original Request: {user_prompt}
+
+Data Collected from Services:
+{_compact(collected_data)}"""
+
+            async for text in self._cached_stream(summary_instructions, summary_request):
+                yield text
 
         except Exception as e:
             logger.error(f"Error generating summary: {str(e)}")
-            return "Unable to generate summary. Raw data available in execution history."
+            yield "Unable to generate summary. Raw data available in execution history."
 
-    def process_prompt_streaming(self, user_prompt: str) -> Generator[StreamEvent, None, OrchestrationTrace]:
+    async def process_prompt_streaming(self, user_prompt: str) -> AsyncGenerator[StreamEvent, None]:
         """
         Process user prompt using ReAct pattern with streaming
         Yields events as they happen
-        Returns final trace with summary
+        The final trace with summary is left on self.current_trace
         """
-        import time
         start_time = time.time()
 
         self.current_trace = OrchestrationTrace(user_prompt=user_prompt)
         self.current_trace.status = "in_progress"
         self.execution_results = {}
+        self.event_queue = asyncio.Queue()
 
-        observations = ""
+        static_prompt = self._create_static_prompt()
+        observations = io.StringIO()
+        observations.write(f"User Request: {user_prompt}\n\n")
         step_count = 0
 
         try:
@@ -491,12 +929,12 @@ Format the response in markdown for better readability. Use headers, bold text,
                 step_count += 1
 
                 # ===== STEP 1: REASONING =====
-                self._emit_event(StreamEvent(
+                yield StreamEvent(
                     event_type="step_started",
                     step_number=step_count,
                     step_type="reasoning",
                     content="🤔 Agent is thinking..."
-                ))
+                )
 
                 reasoning_step = OrchestrationStep(
                     step_number=step_count,
@@ -506,22 +944,31 @@ Format the response in markdown for better readability. Use headers, bold text,
                 self.current_trace.add_step(reasoning_step)
 
                 # Get agent's reasoning
-                react_prompt = self._create_react_prompt(user_prompt, observations)
-                response = self.llm.invoke([HumanMessage(content=react_prompt)])
-                response_text = response.content
+                response_chunks = []
+                # Only the first step's suffix is the bare request; later ones carry observations
+                async for text in self._cached_stream(
+                    static_prompt, f"{observations.getvalue()}\n", semantic=step_count == 1
+                ):
+                    response_chunks.append(text)
+                    yield StreamEvent(
+                        event_type="reasoning_token",
+                        step_number=step_count,
+                        content=text
+                    )
+                response_text = "".join(response_chunks)
 
                 thought, action, action_input = self._parse_agent_response(response_text)
 
                 reasoning_step.reasoning = thought
-                reasoning_step.status = "completed"
+                self.current_trace.complete_step(reasoning_step)
 
                 # Emit reasoning event
-                self._emit_event(StreamEvent(
+                yield StreamEvent(
                     event_type="reasoning",
                     step_number=step_count,
                     content=thought,
                     data={"thought": thought}
-                ))
+                )
 
                 # ===== STEP 2: ACTION =====
                 if action:
@@ -535,9 +982,11 @@ Format the response in markdown for better readability. Use headers, bold text,
                     self.current_trace.add_step(action_step)
 
                     # Execute the action
-                    action_result = self._execute_action(action, action_input or {}, step_count + 1)
+                    action_result = await self._execute_action(action, action_input or {}, step_count + 1)
+                    for event in self._drain_events():
+                        yield event
                     action_step.result = action_result
-                    action_step.status = "completed"
+                    self.current_trace.complete_step(action_step)
 
                     # ===== STEP 3: OBSERVATION =====
                     observation_step = OrchestrationStep(
@@ -549,15 +998,15 @@ Format the response in markdown for better readability. Use headers, bold text,
                     self.current_trace.add_step(observation_step)
 
                     # Emit observation event
-                    self._emit_event(StreamEvent(
+                    yield StreamEvent(
                         event_type="observation",
                         step_number=step_count + 2,
                         content="Observation received",
                         data=action_result
-                    ))
+                    )
 
                     # Update observations for next iteration
-                    observations += f"\nObservation: {json.dumps(action_result, indent=2)}"
+                    observations.write(f"\nObservation: {_dumps(action_result)}")
 
                     # Check if we have a final answer
                     if action == "FINAL_ANSWER":
@@ -571,52 +1020,125 @@ Format the response in markdown for better readability. Use headers, bold text,
                     reasoning_step.status = "failed"
                     self.current_trace.status = "failed"
                     self.current_trace.error = "Failed to parse agent response"
-                    self._emit_event(StreamEvent(
+                    yield StreamEvent(
                         event_type="error",
                         step_number=step_count,
                         content="Failed to parse agent response"
-                    ))
+                    )
                     break
 
         except Exception as e:
             logger.error(f"Error in ReAct loop: {str(e)}")
             self.current_trace.status = "failed"
             self.current_trace.error = str(e)
-            self._emit_event(StreamEvent(
+            for event in self._drain_events():
+                yield event
+            yield StreamEvent(
                 event_type="error",
                 step_number=step_count,
                 content=f"Error: {str(e)}"
-            ))
+            )
 
         # Generate summary
         if self.current_trace.status == "completed" and self.execution_results:
-            self._emit_event(StreamEvent(
+            yield StreamEvent(
                 event_type="step_started",
                 step_number=step_count + 1,
                 content="📝 Generating AI summary..."
-            ))
+            )
 
-            summary = self._generate_summary(user_prompt, self.execution_results)
+            summary_chunks = []
+            async for text in self._generate_summary(user_prompt, self.execution_results):
+                summary_chunks.append(text)
+                yield StreamEvent(
+                    event_type="summary_token",
+                    step_number=step_count + 1,
+                    content=text
+                )
+            summary = "".join(summary_chunks)
             self.current_trace.summary = summary
 
-            self._emit_event(StreamEvent(
+            yield StreamEvent(
                 event_type="summary",
                 step_number=step_count + 1,
                 content=summary,
                 data={"summary": summary}
-            ))
+            )
 
         self.current_trace.execution_time = time.time() - start_time
 
         # Emit completion event
-        self._emit_event(StreamEvent(
+        yield StreamEvent(
             event_type="step_completed",
             step_number=step_count,
             content="Orchestration complete",
             data={"status": self.current_trace.status}
-        ))
+        )
 
-        return self.current_trace
+    async def _batch_events(
+        self,
+        events: AsyncGenerator[StreamEvent, None]
+    ) -> AsyncGenerator[List[StreamEvent], None]:
+        """
+        Coalesce events into batches, flushing every EVENT_BATCH_INTERVAL seconds
+        or immediately on terminal event types. A pending batch is also flushed
+        when no new event arrives within the interval, so slow steps never stall it.
+        """
+        pending: List[StreamEvent] = []
+        last_flush = time.monotonic()
+        next_event: Optional[asyncio.Future] = None
+        try:
+            while True:
+                if next_event is None:
+                    next_event = asyncio.ensure_future(events.__anext__())
+                timeout = None
+                if pending:
+                    timeout = max(0.0, EVENT_BATCH_INTERVAL - (time.monotonic() - last_flush))
+                done, _ = await asyncio.wait({next_event}, timeout=timeout)
+
+                if not done:
+                    yield pending
+                    pending = []
+                    last_flush = time.monotonic()
+                    continue
+
+                try:
+                    event = next_event.result()
+                except StopAsyncIteration:
+                    next_event = None
+                    break
+                next_event = None
+
+                pending.append(event)
+                if (event.event_type in _FLUSH_EVENT_TYPES
+                        or time.monotonic() - last_flush >= EVENT_BATCH_INTERVAL):
+                    yield pending
+                    pending = []
+                    last_flush = time.monotonic()
+
+            if pending:
+                yield pending
+        finally:
+            if next_event is not None:
+                next_event.cancel()
+                await asyncio.gather(next_event, return_exceptions=True)
+            await events.aclose()
+
+    def stream_event_batches(self, user_prompt: str) -> Generator[List[StreamEvent], None, None]:
+        """
+        Synchronous, batched view of process_prompt_streaming for Streamlit.
+        Drives the async generator on the agent's own loop so the pooled
+        HTTP session is reused across runs.
+        """
+        agen = self._batch_events(self.process_prompt_streaming(user_prompt))
+        try:
+            while True:
+                try:
+                    yield self._loop.run_until_complete(agen.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            self._loop.run_until_complete(agen.aclose())
 
 
 # ============================================================================
@@ -627,13 +1149,15 @@ def initialize_session_state():
     """Initialize Streamlit session state"""
     if "service_manager" not in st.session_state:
         st.session_state.service_manager = ServiceManager()
-        _add_default_services(st.session_state.service_manager)
+        for service in _build_default_services():
+            st.session_state.service_manager.add_service(service)
 
     if "agent" not in st.session_state:
         st.session_state.agent = None
 
     if "execution_traces" not in st.session_state:
         st.session_state.execution_traces = []
+        st.session_state.execution_traces_completed = 0
 
     if "current_trace" not in st.session_state:
         st.session_state.current_trace = None
@@ -642,9 +1166,18 @@ def initialize_session_state():
         st.session_state.streaming_active = False
 
 
-def _add_default_services(manager: ServiceManager):
-    """Add default services for demo"""
-    default_services = [
+def _record_trace(trace: OrchestrationTrace):
+    """Append a finished trace to the session history and update the running counters"""
+    st.session_state.execution_traces.append(trace)
+    st.session_state.current_trace = trace
+    if trace.status == "completed":
+        st.session_state.execution_traces_completed += 1
+
+
+@st.cache_resource
+def _build_default_services() -> List[ServiceConfig]:
+    """Build the default demo services once per process (shared, immutable)"""
+    return [
         ServiceConfig(
             id="weather_service",
             name="Weather Service",
@@ -683,10 +1216,78 @@ def _add_default_services(manager: ServiceManager):
         ),
     ]
 
-    for service in default_services:
-        manager.add_service(service)
+
+_EVENT_ICONS = {
+    "step_started": "🔄",
+    "reasoning": "🤔",
+    "action": "⚡",
+    "observation": "👁️",
+    "final_answer": "✅",
+    "error": "❌",
+    "step_completed": "🏁",
+    "summary": "📝"
+}
+
+
+def _payload_preview(data: Any) -> Tuple[str, bool]:
+    """
+    JSON preview of an event payload for the live stream, as (text, truncated).
+    Payloads over PAYLOAD_PREVIEW_BYTES are cut to a compact head slice.
+    """
+    pretty = _dumps(data)
+    if len(pretty) <= PAYLOAD_PREVIEW_BYTES:
+        return pretty, False
+    compact = orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS, default=str)
+    return compact[:PAYLOAD_PREVIEW_BYTES].decode(errors="ignore") + " …", True
+
+
+def _fmt_reasoning(evt: StreamEvent) -> Tuple[str, bool]:
+    return f"\n{_EVENT_ICONS['reasoning']} **Step {evt.step_number} - Thought:**\n> {evt.content}\n", False
+
+
+def _fmt_payload(evt: StreamEvent) -> Tuple[str, bool]:
+    label = "Action" if evt.event_type == "action" else "Observation"
+    fragment = f"\n{_EVENT_ICONS[evt.event_type]} **Step {evt.step_number} - {label}:**\n"
+    truncated = False
+    if evt.data:
+        preview, truncated = _payload_preview(evt.data)
+        fragment += f"```json\n{preview}\n```\n"
+        if truncated:
+            fragment += "_Preview truncated; full payload below the stream._\n"
+    return fragment, truncated
+
+
+def _fmt_final_answer(evt: StreamEvent) -> Tuple[str, bool]:
+    return f"\n{_EVENT_ICONS['final_answer']} **Final Answer:**\n> {evt.content}\n", False
+
+
+def _fmt_error(evt: StreamEvent) -> Tuple[str, bool]:
+    return f"\n{_EVENT_ICONS['error']} **Error:** {evt.content}\n", False
+
+
+def _fmt_default(evt: StreamEvent) -> Tuple[str, bool]:
+    # step_started / step_completed / summary are shown through metrics and the summary panel
+    return "", False
+
+
+_EVENT_FORMATTERS: Dict[str, Callable[[StreamEvent], Tuple[str, bool]]] = {
+    "reasoning": _fmt_reasoning,
+    "action": _fmt_payload,
+    "observation": _fmt_payload,
+    "final_answer": _fmt_final_answer,
+    "error": _fmt_error,
+}
 
 
+def format_event(evt: StreamEvent) -> Tuple[str, bool]:
+    """
+    Format a single event as a markdown fragment for the live execution stream.
+    Returns (fragment, truncated), where truncated means the payload was only previewed.
+    """
+    return _EVENT_FORMATTERS.get(evt.event_type, _fmt_default)(evt)
+
+
+@st.fragment
 def render_streaming_executor():
     """Render the streaming agent executor"""
     st.subheader("🤖 ReAct Agent Executor (Streaming + Summarization)")
@@ -713,13 +1314,21 @@ def render_streaming_executor():
 
     with col2:
         st.write("**Available Services:**")
-        services = st.session_state.service_manager.list_services()
-        for service in services:
-            with st.expander(service.name, expanded=False):
-                st.write(f"📝 {service.description}")
-                st.write(f"🔗 `{service.url}`")
-                st.write(f"📥 Input: {', '.join(service.input_params)}")
-                st.write(f"📤 Output: {', '.join(service.output_params)}")
+        if st.toggle("Advanced", key="executor_services_advanced"):
+            services = st.session_state.service_manager.list_services()
+            for service in services:
+                with st.expander(service.name, expanded=False):
+                    st.write(f"📝 {service.description}")
+                    st.write(f"🔗 `{service.url}`")
+                    st.write(f"📥 Input: {', '.join(service.input_params)}")
+                    st.write(f"📤 Output: {', '.join(service.output_params)}")
+        else:
+            table = st.session_state.service_manager.get_table()
+            st.dataframe(
+                {"name": table["name"], "input_params": table["input_params"]},
+                use_container_width=True,
+                hide_index=True
+            )
 
     # Streaming execution
     if st.session_state.streaming_active and user_prompt:
@@ -739,6 +1348,8 @@ def render_streaming_executor():
 
         with stream_container:
             stream_placeholder = st.empty()
+            # Full payloads too large for the inline preview, collapsed by default
+            payloads_container = st.container()
 
         # Summary container
         summary_placeholder = st.empty()
@@ -746,58 +1357,111 @@ def render_streaming_executor():
         # Process with streaming
         trace = None
         step_count = 0
-        events_log = []
+        last_event = None
+        display_buffer = []
+        display_content = ""
+        partial_thought = ""
+        partial_summary = ""
+        thinking_step = None
+        log_dirty = False
+        summary_dirty = False
+        # Metric widgets are only re-sent when their value changes (time/services at most every METRIC_INTERVAL)
+        started_at = time.monotonic()
+        services_called = 0
+        shown_step = None
+        shown_status = None
+        last_metric_flush = 0.0
+
+        def update_metrics():
+            nonlocal shown_step, shown_status, last_metric_flush
+            event = last_event
+            status = event.event_type.upper()
+            if event.step_number != shown_step:
+                metric_step.metric("Current Step", event.step_number)
+                shown_step = event.step_number
+            status_changed = status != shown_status
+            if status_changed:
+                metric_status.metric("Status", status)
+                shown_status = status
+            now = time.monotonic()
+            if status_changed or now - last_metric_flush >= METRIC_INTERVAL:
+                metric_time.metric("Elapsed", f"{now - started_at:.1f}s")
+                metric_services.metric("Services Called", services_called)
+                last_metric_flush = now
+
+        def render():
+            """Redraw the summary, metrics and stream from the accumulated state"""
+            nonlocal display_content
+
+            if summary_dirty:
+                with summary_placeholder.container():
+                    st.success("### ✅ AI-Generated Summary")
+                    st.markdown(partial_summary)
+
+            if log_dirty:
+                update_metrics()
+                display_content = "".join(display_buffer)
+
+            # Update stream display
+            with stream_placeholder.container():
+                if thinking_step is not None:
+                    st.markdown(
+                        display_content
+                        + f"\n🤔 **Step {thinking_step} - Thinking...**\n> {partial_thought}\n"
+                    )
+                else:
+                    st.markdown(display_content)
 
         try:
-            for event in st.session_state.agent.process_prompt_streaming(user_prompt):
-                events_log.append(event)
-                step_count += 1
-
-                # Update metrics
-                metric_step.metric("Current Step", event.step_number)
-                metric_status.metric("Status", event.event_type.upper())
-
-                # Build display content
-                display_content = ""
-                for evt in events_log:
-                    icon_map = {
-                        "step_started": "🔄",
-                        "reasoning": "🤔",
-                        "action": "⚡",
-                        "observation": "👁️",
-                        "final_answer": "✅",
-                        "error": "❌",
-                        "step_completed": "🏁",
-                        "summary": "📝"
-                    }
-                    icon = icon_map.get(evt.event_type, "📍")
-
-                    if evt.event_type == "reasoning":
-                        display_content += f"\n{icon} **Step {evt.step_number} - Thought:**\n> {evt.content}\n"
-                    elif evt.event_type == "action":
-                        display_content += f"\n{icon} **Step {evt.step_number} - Action:**\n"
-                        if evt.data:
-                            display_content += f"```json\n{json.dumps(evt.data, indent=2)}\n```\n"
-                    elif evt.event_type == "observation":
-                        display_content += f"\n{icon} **Step {evt.step_number} - Observation:**\n"
-                        if evt.data:
-                            display_content += f"```json\n{json.dumps(evt.data, indent=2)}\n```\n"
-                    elif evt.event_type == "final_answer":
-                        display_content += f"\n{icon} **Final Answer:**\n> {evt.content}\n"
-                    elif evt.event_type == "error":
-                        display_content += f"\n{icon} **Error:** {evt.content}\n"
-                    elif evt.event_type == "summary":
+            # The agent runs at full speed; redraws are gated to at most one per RENDER_INTERVAL
+            last_render = 0.0
+            for batch in st.session_state.agent.stream_event_batches(user_prompt):
+                force_render = False
+                for event in batch:
+                    # Token events only extend the in-progress text; they are not logged
+                    if event.event_type == "reasoning_token":
+                        partial_thought += event.content
+                        thinking_step = event.step_number
+                        continue
+                    if event.event_type == "summary_token":
+                        partial_summary += event.content
+                        summary_dirty = True
+                        continue
+                    partial_thought = ""
+                    thinking_step = None
+
+                    # Only the formatted fragment is kept, not the event and its payload
+                    last_event = event
+                    fragment, truncated = format_event(event)
+                    display_buffer.append(fragment)
+                    if truncated:
+                        with payloads_container.expander(
+                            f"Step {event.step_number} - full {event.event_type} payload", expanded=False
+                        ):
+                            st.json(event.data, expanded=False)
+                    step_count += 1
+                    log_dirty = True
+                    if event.event_type == "action" and event.data:
+                        if "calls" in event.data:
+                            services_called += len(event.data["calls"])
+                        elif "service" in event.data:
+                            services_called += 1
+                    if event.event_type == "summary":
                         # Display summary separately
-                        with summary_placeholder.container():
-                            st.success("### ✅ AI-Generated Summary")
-                            st.markdown(evt.content)
+                        partial_summary = event.content
+                        summary_dirty = True
+                    if event.event_type in _FORCE_RENDER_EVENT_TYPES:
+                        force_render = True
 
-                # Update stream display
-                with stream_placeholder.container():
-                    st.markdown(display_content)
+                now = time.monotonic()
+                if not force_render and now - last_render < RENDER_INTERVAL:
+                    continue
+                render()
+                last_render = now
+                log_dirty = summary_dirty = False
 
-                # Small delay for visual effect
-                time.sleep(0.1)
+            # Final render so nothing held back by the gate is lost
+            render()
 
             # Get final trace
             trace = st.session_state.agent.current_trace
@@ -807,8 +1471,7 @@ def render_streaming_executor():
 
         # Store trace
         if trace:
-            st.session_state.execution_traces.append(trace)
-            st.session_state.current_trace = trace
+            _record_trace(trace)
 
             # Final metrics
             with metrics_container:
@@ -816,12 +1479,12 @@ def render_streaming_executor():
                 col1.metric("Total Steps", trace.total_steps)
                 col2.metric("Status", trace.status.upper())
                 col3.metric("Execution Time", f"{trace.execution_time:.2f}s")
-                successful = sum(1 for s in trace.steps if s.status == "completed")
-                col4.metric("Completed", successful)
+                col4.metric("Completed", trace.completed_steps)
 
         st.session_state.streaming_active = False
 
 
+@st.fragment
 def render_service_config():
     """Render the service configuration tab"""
     st.subheader("⚙️ Service Configuration")
@@ -861,6 +1524,12 @@ def render_service_config():
 
     if not services:
         st.info("No services configured yet. Add one above!")
+    elif not st.toggle("Advanced (edit per service)", key="config_services_advanced"):
+        st.dataframe(
+            st.session_state.service_manager.get_table(),
+            use_container_width=True,
+            hide_index=True
+        )
     else:
         for service in services:
             col1, col2 = st.columns([4, 1])
@@ -881,6 +1550,31 @@ def render_service_config():
                     st.rerun()
 
 
+_STEP_ICONS = {
+    StepType.REASONING: "🤔",
+    StepType.ACTION: "⚡",
+    StepType.OBSERVATION: "👁️",
+    StepType.FINAL_ANSWER: "✅"
+}
+
+
+@st.cache_data(show_spinner=False)
+def _format_trace_markdown(trace_id: str, trace_version: int, _trace: OrchestrationTrace) -> str:
+    """Render a trace's detailed steps as markdown, cached per (trace_id, trace_version)"""
+    parts = []
+    for step in _trace.steps:
+        step_icon = _STEP_ICONS.get(step.step_type, "📍")
+        parts.append(f"#### {step_icon} Step {step.step_number}: {step.step_type.value.upper()}\n")
+        if step.reasoning:
+            parts.append(f"**Thought:**\n> {step.reasoning}\n")
+        if step.action:
+            parts.append(f"**Action:**\n```json\n{_dumps(step.action)}\n```\n")
+        if step.observation:
+            parts.append(f"**Observation:**\n```json\n{_dumps(step.observation)}\n```\n")
+    return "\n".join(parts)
+
+
+@st.fragment
 def render_execution_history():
     """Render execution history tab"""
     st.subheader("📋 Execution History")
@@ -908,25 +1602,8 @@ def render_execution_history():
                     st.error(f"**Error:** {trace.error}")
 
                 # Show detailed steps
-                with st.expander("View Detailed Steps"):
-                    for step in trace.steps:
-                        step_icon = {
-                            StepType.REASONING: "🤔",
-                            StepType.ACTION: "⚡",
-                            StepType.OBSERVATION: "👁️",
-                            StepType.FINAL_ANSWER: "✅"
-                        }.get(step.step_type, "📍")
-
-                        with st.expander(f"{step_icon} Step {step.step_number}: {step.step_type.value.upper()}"):
-                            if step.reasoning:
-                                st.write("**Thought:**")
-                                st.info(step.reasoning)
-                            if step.action:
-                                st.write("**Action:**")
-                                st.json(step.action)
-                            if step.observation:
-                                st.write("**Observation:**")
-                                st.json(step.observation)
+                if st.checkbox("View Detailed Steps", key=f"history_steps_{trace.trace_id}"):
+                    st.markdown(_format_trace_markdown(trace.trace_id, trace.total_steps, trace))
 
 
 def main():
@@ -966,25 +1643,25 @@ def main():
                 )
                 st.success("✅ API Key configured!")
             else:
-                st.session_state.agent.llm.api_key = api_key
+                # No-op unless the key actually changed
+                st.session_state.agent.set_api_key(api_key)
 
         st.divider()
 
         max_steps = st.slider("Max Steps", min_value=3, max_value=20, value=10)
-        if st.session_state.agent:
+        if st.session_state.agent and st.session_state.agent.max_steps != max_steps:
             st.session_state.agent.max_steps = max_steps
 
         st.divider()
         st.write("**Statistics:**")
         col1, col2, col3 = st.columns(3)
         with col1:
-            st.metric("Services", len(st.session_state.service_manager.list_services()))
+            st.metric("Services", st.session_state.service_manager.count)
         with col2:
             st.metric("Executions", len(st.session_state.execution_traces))
         with col3:
             if st.session_state.execution_traces:
-                completed = sum(1 for t in st.session_state.execution_traces if t.status == "completed")
-                st.metric("Success", completed)
+                st.metric("Success", st.session_state.execution_traces_completed)
 
     # Main tabs
     tab1, tab2, tab3 = st.tabs(["🤖 ReAct Executor", "⚙️ Service Config", "📋 History"])
@@ -17,14 +17,36 @@ Tech Stack:
 """
 
 import streamlit as st
+import asyncio
 import json
-import requests
-from typing import Dict, List, Any, Optional, Tuple
-from dataclasses import dataclass, asdict
+import logging
+import os
+import re
+import sys
+import orjson
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Any, Optional, Tuple
+from dataclasses import dataclass, field
 from enum import Enum
+from collections import OrderedDict, defaultdict
+import copy
+import time
 import traceback
-from langgraph.graph import StateGraph, END
-from typing_extensions import TypedDict
+from concurrent.futures import Future
+import hashlib
+from http import HTTPStatus
+import random
+from urllib.parse import urlsplit
+from functools import lru_cache
+import queue
+import threading
+from typing_extensions import NotRequired, TypedDict
+
+# aiohttp and langgraph are imported where they are first used, keeping them off the first paint
+if TYPE_CHECKING:
+    import aiohttp
+    from langgraph.graph import StateGraph
+
+logger = logging.getLogger(__name__)
 
 
 # ============================================================================
@@ -33,7 +55,76 @@ from typing_extensions import TypedDict
 
 DEFAULT_MODEL = "default-model"
 REGISTRY_FILE_PATH = "api_registry.json"
+REGISTRY_SAVE_DEBOUNCE = 2.0  # Seconds to coalesce registry saves before writing
+
+# Starting text for the schema fields of the "Add New API" form
+DEFAULT_INPUT_SCHEMA_TEXT = """{
+  "param_name": {
+    "type": "string",
+    "required": true,
+    "description": "Parameter description"
+  }
+}"""
+DEFAULT_OUTPUT_SCHEMA_TEXT = """{
+  "field_name": {
+    "type": "string",
+    "description": "Field description"
+  }
+}"""
 DEFAULT_TEMPERATURE = 0.7
+ASYNC_CONNECTION_LIMIT = 64  # Total pooled connections on the shared aiohttp session
+
+# Request headers shared by every API call
+DEFAULT_HEADERS = {
+    "Content-Type": "application/json",
+    "Accept": "application/json"
+    # Extension point: Add authentication headers here
+    # "Authorization": f"Bearer {token}"
+}
+HTTP_TIMEOUT = (5, 30)  # (connect, read) seconds
+HTTP_ERROR_BODY_BYTES = 512  # Body prefix kept on 4xx/5xx results
+DEBUG_TRACEBACKS = os.getenv("API_SELECTOR_DEBUG") == "1"  # Capture exception info on unexpected errors
+
+# Reliability settings for outbound API calls (applied per host)
+MAX_RETRIES = 3
+# Only these may be retried after the request was sent; others retry connect-phase failures only
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRY_BASE_DELAY = 0.2  # seconds; backoff is base * 2**attempt with full jitter
+RETRY_MAX_DELAY = 5.0
+BULKHEAD_SIZE = 16  # Concurrent in-flight calls allowed per host
+BREAKER_FAILURE_THRESHOLD = 5  # Consecutive failures before the circuit opens
+BREAKER_RESET_TIMEOUT = 30.0  # Seconds an open circuit waits before a trial call
+
+# Fused mode: one tool-calling conversation replaces planning + summarization
+FUSED_MODE_MAX_APIS = 20  # Only for registries small enough to expose every API as a tool
+FUSED_MODE_MAX_PLAN_STEPS = 3  # ...and sessions whose recent plans stayed this short and read-only
+MAX_AGENT_TURNS = 6  # Tool-call rounds before the fused loop gives up
+
+DIRECT_ANSWER_MAX_FIELDS = 8  # Single-call results up to this many scalar fields skip summarization
+
+# Provider behind the company LLM SDK; only Anthropic takes cache_control content blocks,
+# OpenAI-style endpoints cache a stable prompt prefix on their own
+LLM_PROVIDER = os.getenv("API_SELECTOR_LLM_PROVIDER", "openai").lower()
+# Marks the static planning prefix as eligible for provider-side prompt caching (Anthropic)
+PROMPT_CACHE_CONTROL = {"type": "ephemeral"}
+PLANNER_SYSTEM_PROMPT = "You are an expert API orchestration planner. Always respond with valid JSON."
+
+
+def _json_default(obj: Any) -> Any:
+    """orjson fallback: unwrap lazily parsed responses, stringify anything else."""
+    if isinstance(obj, LazyJSON):
+        return obj.value
+    return str(obj)
+
+
+def _dumps_pretty_bytes(obj: Any) -> bytes:
+    """Pretty-print an object as JSON bytes using orjson (non-JSON types fall back to str)."""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS, default=_json_default)
+
+
+def _dumps_pretty(obj: Any) -> str:
+    """Pretty-print an object as JSON using orjson (non-JSON types fall back to str)."""
+    return _dumps_pretty_bytes(obj).decode()
 
 
 # ============================================================================
@@ -59,6 +150,8 @@ class MockSDKClient:
         @staticmethod
         def create(model: str, messages: list, stream: bool = False, temperature: float = 1.0, n: int = 1, **kwargs):
             # Mock response structure - replace with actual SDK call
+            if stream:
+                return iter([{"choices": [{"delta": {"content": "Mock chat response"}}]}])
             return {
                 "choices": [
                     {"message": {"content": "Mock chat response"}}
@@ -69,6 +162,39 @@ class MockSDKClient:
 # Initialize the SDK client - REPLACE THIS WITH ACTUAL SDK INITIALIZATION
 client = MockSDKClient()
 
+# In-flight LLM requests keyed by a hash of (endpoint, model, input, temperature).
+# Identical concurrent calls (double clicks, rerun races) share one SDK request.
+_inflight: Dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+
+def _call_deduplicated(key_parts: Any, call: Callable[[], str]) -> str:
+    """
+    Run call() unless an identical request is already in flight, in which case
+    wait for and return that request's result. Nothing is cached after completion.
+    """
+    key = hashlib.blake2b(orjson.dumps(key_parts, default=str), digest_size=16).hexdigest()
+    with _inflight_lock:
+        future = _inflight.get(key)
+        is_owner = future is None
+        if is_owner:
+            future = Future()
+            _inflight[key] = future
+    
+    if not is_owner:
+        return future.result()
+    
+    try:
+        result = call()
+        future.set_result(result)
+        return result
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
 
 def llm_completion(prompt: str, model: str = DEFAULT_MODEL, temperature: float = DEFAULT_TEMPERATURE) -> str:
     """
@@ -82,46 +208,156 @@ def llm_completion(prompt: str, model: str = DEFAULT_MODEL, temperature: float =
     Returns:
         The completion text as a string
     """
+    def call() -> str:
+        try:
+            response = client.completion.create(
+                model=model,
+                prompt=prompt,
+                stream=False,
+                temperature=temperature,
+                n=1
+            )
+            # Parse the response and extract text
+            return response["choices"][0]["text"]
+        except Exception as e:
+            st.error(f"LLM Completion Error: {str(e)}")
+            return ""
+    
+    return _call_deduplicated(["completion", model, prompt, temperature], call)
+
+
+def llm_chat(messages: list, model: str = DEFAULT_MODEL, temperature: float = DEFAULT_TEMPERATURE) -> str:
+    """
+    Wrapper for company LLM chat API.
+    
+    Args:
+        messages: List of message dicts with 'role' and 'content'
+        model: Model identifier
+        temperature: Sampling temperature
+        
+    Returns:
+        The assistant's response text as a string
+    """
+    def call() -> str:
+        try:
+            response = client.chat.create(
+                model=model,
+                messages=messages,
+                stream=False,
+                temperature=temperature,
+                n=1
+            )
+            # Parse the response and extract assistant message content
+            return response["choices"][0]["message"]["content"]
+        except Exception as e:
+            st.error(f"LLM Chat Error: {str(e)}")
+            return ""
+    
+    return _call_deduplicated(["chat", model, messages, temperature], call)
+
+
+def llm_chat_tools(messages: list, tools: list, model: str = DEFAULT_MODEL, temperature: float = DEFAULT_TEMPERATURE) -> Dict[str, Any]:
+    """
+    Wrapper for company LLM chat API with function calling.
+    
+    Args:
+        messages: List of message dicts (including prior tool calls and results)
+        tools: OpenAI-style tool definitions
+        model: Model identifier
+        temperature: Sampling temperature
+        
+    Returns:
+        The assistant message dict ('content' and optional 'tool_calls')
+    """
     try:
-        response = client.completion.create(
+        response = client.chat.create(
             model=model,
-            prompt=prompt,
+            messages=messages,
+            tools=tools,
             stream=False,
             temperature=temperature,
             n=1
         )
-        # Parse the response and extract text
-        return response["choices"][0]["text"]
+        return response["choices"][0]["message"]
     except Exception as e:
-        st.error(f"LLM Completion Error: {str(e)}")
-        return ""
+        st.error(f"LLM Chat Error: {str(e)}")
+        return {"content": ""}
 
 
-def llm_chat(messages: list, model: str = DEFAULT_MODEL, temperature: float = DEFAULT_TEMPERATURE) -> str:
+def llm_chat_stream(messages: list, model: str = DEFAULT_MODEL, temperature: float = DEFAULT_TEMPERATURE) -> Iterator[str]:
     """
-    Wrapper for company LLM chat API.
+    Streaming variant of llm_chat.
     
     Args:
         messages: List of message dicts with 'role' and 'content'
         model: Model identifier
         temperature: Sampling temperature
         
-    Returns:
-        The assistant's response text as a string
+    Yields:
+        Content deltas of the assistant's response as they arrive
     """
     try:
         response = client.chat.create(
             model=model,
             messages=messages,
-            stream=False,
+            stream=True,
             temperature=temperature,
             n=1
         )
-        # Parse the response and extract assistant message content
-        return response["choices"][0]["message"]["content"]
+        for chunk in response:
+            content = chunk["choices"][0].get("delta", {}).get("content")
+            if content:
+                yield content
     except Exception as e:
         st.error(f"LLM Chat Error: {str(e)}")
-        return ""
+
+
+class JsonEnvelopeScanner:
+    """
+    Incrementally finds the first complete top-level JSON object in streamed text.
+    
+    Tracks brace depth outside string literals, so the object can be parsed the
+    moment it closes instead of after the model's final token.
+    """
+    
+    def __init__(self):
+        self.buffer: List[str] = []
+        self._length = 0
+        self._start: Optional[int] = None
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+    
+    def feed(self, chunk: str) -> Optional[str]:
+        """Consume a chunk; return the JSON object text once it is complete."""
+        offset = self._length
+        self.buffer.append(chunk)
+        self._length += len(chunk)
+        
+        for i, ch in enumerate(chunk):
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                if self._start is not None:
+                    self._in_string = True
+            elif ch == "{":
+                if self._start is None:
+                    self._start = offset + i
+                self._depth += 1
+            elif ch == "}" and self._start is not None:
+                self._depth -= 1
+                if self._depth == 0:
+                    return self.text()[self._start:offset + i + 1]
+        return None
+    
+    def text(self) -> str:
+        """Everything received so far."""
+        return "".join(self.buffer)
 
 
 # ============================================================================
@@ -136,7 +372,7 @@ class HttpMethod(Enum):
     DELETE = "DELETE"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ApiDefinition:
     """Schema for an API definition in the registry."""
     name: str
@@ -146,15 +382,76 @@ class ApiDefinition:
     input_schema: Dict[str, Any]  # Description of inputs
     output_schema: Dict[str, Any]  # Description of outputs
     type: str = "rest"
-    tags: List[str] = None
+    tags: List[str] = field(default_factory=list)
     domain: str = ""
-    example_inputs: Dict[str, Any] = None
+    example_inputs: Dict[str, Any] = field(default_factory=dict)
+    cacheable: bool = True  # GET responses may be served from the response cache
+    cache_ttl: float = 60.0  # Seconds a cached response stays valid
+    supports_projection: bool = False  # API accepts a field-selection query parameter
+    projection_param: str = "fields"  # Name of that parameter (?fields=a,b,c)
     
     def __post_init__(self):
-        if self.tags is None:
-            self.tags = []
-        if self.example_inputs is None:
-            self.example_inputs = {}
+        # Normalize once so the per-call dispatch is a plain dict lookup
+        object.__setattr__(self, "method", sys.intern(self.method.upper()))
+
+
+def _render_llm_block(api_def: ApiDefinition) -> str:
+    """Format one API's description for the LLM planning context."""
+    lines = [
+        f"API Name: {api_def.name}",
+        f"   Description: {api_def.description}",
+        f"   Method: {api_def.method}",
+        f"   URL: {api_def.url}",
+        f"   Domain: {api_def.domain}",
+        f"   Input Schema: {_dumps_pretty(api_def.input_schema)}",
+        f"   Output Schema: {_dumps_pretty(api_def.output_schema)}",
+    ]
+    if api_def.example_inputs:
+        lines.append(f"   Example Inputs: {_dumps_pretty(api_def.example_inputs)}")
+    if api_def.tags:
+        lines.append(f"   Tags: {', '.join(api_def.tags)}")
+    return "\n".join(lines)
+
+
+# Registry type names -> JSON Schema types for tool definitions
+_JSON_SCHEMA_TYPES = {
+    "string": "string",
+    "boolean": "boolean",
+    "integer": "integer",
+    "int": "integer",
+    "number": "number",
+    "float": "number",
+    "object": "object",
+}
+
+
+def _json_schema_type(type_name: str) -> Dict[str, Any]:
+    """Translate a registry type like 'list[string]' into a JSON Schema fragment."""
+    if type_name.startswith("list[") and type_name.endswith("]"):
+        return {"type": "array", "items": _json_schema_type(type_name[5:-1])}
+    return {"type": _JSON_SCHEMA_TYPES.get(type_name, "string")}
+
+
+def _render_tool(api_def: ApiDefinition) -> Dict[str, Any]:
+    """Describe one API as an OpenAI-style function-calling tool."""
+    properties = {}
+    required = []
+    for param_name, spec in api_def.input_schema.items():
+        spec = spec if isinstance(spec, dict) else {}
+        properties[param_name] = {
+            **_json_schema_type(spec.get("type", "string")),
+            "description": spec.get("description", "")
+        }
+        if spec.get("required"):
+            required.append(param_name)
+    return {
+        "type": "function",
+        "function": {
+            "name": api_def.name,
+            "description": api_def.description,
+            "parameters": {"type": "object", "properties": properties, "required": required}
+        }
+    }
 
 
 class ApiRegistry:
@@ -165,49 +462,141 @@ class ApiRegistry:
     
     def __init__(self):
         self.apis: Dict[str, ApiDefinition] = {}
+        # Bumped on every mutation; to_llm_context is cached against it
+        self._version: int = 0
+        self._context_cache: Optional[Tuple[int, str]] = None
+        self._context_hash: Optional[Tuple[int, str]] = None
+        self._tools_cache: Optional[Tuple[int, List[Dict[str, Any]]]] = None
+        # Per-API LLM context block (everything after the "N. " list number), built once in add_api
+        self._llm_blocks: Dict[str, str] = {}
+        # Secondary indexes for O(1) resolution and shortlisting
+        self._by_lower_name: Dict[str, str] = {}
+        self._by_tag: Dict[str, set] = defaultdict(set)
+        self._by_domain: Dict[str, set] = defaultdict(set)
+    
+    def _index(self, api_def: ApiDefinition) -> None:
+        """Add an API to the secondary indexes."""
+        self._by_lower_name[api_def.name.lower()] = api_def.name
+        for tag in api_def.tags:
+            self._by_tag[tag.lower()].add(api_def.name)
+        self._by_domain[api_def.domain.lower()].add(api_def.name)
+    
+    def _unindex(self, api_def: ApiDefinition) -> None:
+        """Remove an API from the secondary indexes, dropping empty buckets."""
+        self._by_lower_name.pop(api_def.name.lower(), None)
+        for tag in api_def.tags:
+            self._discard(self._by_tag, tag.lower(), api_def.name)
+        self._discard(self._by_domain, api_def.domain.lower(), api_def.name)
+    
+    @staticmethod
+    def _discard(index: Dict[str, set], key: str, name: str) -> None:
+        """Remove a name from an index bucket, deleting the bucket once empty."""
+        names = index.get(key)
+        if names is not None:
+            names.discard(name)
+            if not names:
+                del index[key]
+    
+    def copy(self) -> "ApiRegistry":
+        """
+        Return an independent registry with the same contents.
+        Definitions, rendered blocks and caches are immutable and shared; only the
+        containers are copied, so nothing is re-rendered.
+        """
+        clone = ApiRegistry()
+        clone.apis = dict(self.apis)
+        clone._version = self._version
+        clone._context_cache = self._context_cache
+        clone._context_hash = self._context_hash
+        clone._tools_cache = self._tools_cache
+        clone._llm_blocks = dict(self._llm_blocks)
+        clone._by_lower_name = dict(self._by_lower_name)
+        clone._by_tag = defaultdict(set, {tag: set(names) for tag, names in self._by_tag.items()})
+        clone._by_domain = defaultdict(set, {domain: set(names) for domain, names in self._by_domain.items()})
+        return clone
     
     def list_apis(self) -> List[ApiDefinition]:
         """Return list of all registered APIs."""
         return list(self.apis.values())
     
     def get_api_by_name(self, name: str) -> Optional[ApiDefinition]:
-        """Retrieve an API definition by name."""
-        return self.apis.get(name)
+        """Retrieve an API definition by name (falls back to a case-insensitive match)."""
+        api_def = self.apis.get(name)
+        if api_def is None:
+            canonical = self._by_lower_name.get(name.lower())
+            if canonical is not None:
+                api_def = self.apis.get(canonical)
+        return api_def
+    
+    def shortlist(self, tags: Optional[List[str]] = None, domain: Optional[str] = None) -> List[ApiDefinition]:
+        """
+        Return APIs matching any of the given tags and, if given, the domain.
+        With no filters, returns every API.
+        """
+        names: Optional[set] = None
+        if tags:
+            names = set().union(*(self._by_tag.get(tag.lower(), set()) for tag in tags))
+        if domain:
+            domain_names = self._by_domain.get(domain.lower(), set())
+            names = domain_names if names is None else names & domain_names
+        if names is None:
+            return self.list_apis()
+        return [api for name, api in self.apis.items() if name in names]
     
     def add_api(self, api_def: ApiDefinition) -> None:
         """Add or update an API in the registry."""
+        previous = self.apis.get(api_def.name)
+        if previous is not None:
+            self._unindex(previous)
         self.apis[api_def.name] = api_def
+        self._index(api_def)
+        self._llm_blocks[api_def.name] = _render_llm_block(api_def)
+        self._version += 1
     
     def remove_api(self, name: str) -> bool:
         """Remove an API from the registry. Returns True if removed."""
         if name in self.apis:
-            del self.apis[name]
+            self._unindex(self.apis.pop(name))
+            self._llm_blocks.pop(name, None)
+            self._version += 1
             return True
         return False
     
     def load_from_json(self, path: str) -> None:
-        """Load API registry from a JSON file."""
+        """Load API registry from a JSON file (parsed definitions are cached per file mtime)."""
         try:
-            with open(path, 'r') as f:
-                data = json.load(f)
-                self.apis = {}
-                for api_dict in data.get('apis', []):
-                    api_def = ApiDefinition(**api_dict)
-                    self.apis[api_def.name] = api_def
+            api_defs = _load_api_definitions(path, os.path.getmtime(path))
         except FileNotFoundError:
             # File doesn't exist yet, start with empty registry
-            pass
+            return
         except Exception as e:
             st.error(f"Error loading registry: {str(e)}")
+            return
+        
+        # Build the new state off to the side, then swap it in
+        loaded = ApiRegistry()
+        for api_def in api_defs:
+            loaded.add_api(api_def)
+        self.apis = loaded.apis
+        self._llm_blocks = loaded._llm_blocks
+        self._by_lower_name = loaded._by_lower_name
+        self._by_tag = loaded._by_tag
+        self._by_domain = loaded._by_domain
+        self._version += 1
+    
+    def write_json(self, path: str) -> None:
+        """Write API registry to a JSON file, raising on failure."""
+        # orjson serializes the dataclasses natively, no asdict() copy needed
+        data = {
+            'apis': list(self.apis.values())
+        }
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
     
     def save_to_json(self, path: str) -> None:
         """Save API registry to a JSON file."""
         try:
-            data = {
-                'apis': [asdict(api) for api in self.apis.values()]
-            }
-            with open(path, 'w') as f:
-                json.dump(data, f, indent=2)
+            self.write_json(path)
         except Exception as e:
             st.error(f"Error saving registry: {str(e)}")
     
@@ -216,219 +605,721 @@ class ApiRegistry:
         Format the registry as a string suitable for LLM context.
         Includes all relevant information for planning.
         """
+        if self._context_cache is not None and self._context_cache[0] == self._version:
+            return self._context_cache[1]
+        
         if not self.apis:
             return "No APIs currently registered."
         
-        context_parts = ["Available APIs:\n"]
-        for i, api in enumerate(self.apis.values(), 1):
-            context_parts.append(f"\n{i}. API Name: {api.name}")
-            context_parts.append(f"   Description: {api.description}")
-            context_parts.append(f"   Method: {api.method}")
-            context_parts.append(f"   URL: {api.url}")
-            context_parts.append(f"   Domain: {api.domain}")
-            context_parts.append(f"   Input Schema: {json.dumps(api.input_schema, indent=2)}")
-            context_parts.append(f"   Output Schema: {json.dumps(api.output_schema, indent=2)}")
-            if api.example_inputs:
-                context_parts.append(f"   Example Inputs: {json.dumps(api.example_inputs, indent=2)}")
-            if api.tags:
-                context_parts.append(f"   Tags: {', '.join(api.tags)}")
+        # Only the list numbering depends on position; the blocks themselves are prebuilt
+        context = "\n".join(
+            ["Available APIs:\n"]
+            + [f"\n{i}. {self._llm_blocks[name]}" for i, name in enumerate(self.apis, 1)]
+        )
+        self._context_cache = (self._version, context)
+        return context
+    
+    @property
+    def context_hash(self) -> str:
+        """Content hash of to_llm_context(), for cache keys that shouldn't hash the full string."""
+        if self._context_hash is None or self._context_hash[0] != self._version:
+            digest = hashlib.blake2b(self.to_llm_context().encode(), digest_size=16).hexdigest()
+            self._context_hash = (self._version, digest)
+        return self._context_hash[1]
+    
+    def to_tools(self) -> List[Dict[str, Any]]:
+        """
+        Describe every read-only (GET) API as a function-calling tool.
+        Fused mode runs tool calls without a confirmed plan, so mutating APIs are never offered.
+        """
+        if self._tools_cache is None or self._tools_cache[0] != self._version:
+            tools = [_render_tool(api_def) for api_def in self.apis.values() if api_def.method == "GET"]
+            self._tools_cache = (self._version, tools)
+        return self._tools_cache[1]
+
+
+def _registry_save_worker(save_queue: "queue.Queue[Tuple[ApiRegistry, str]]") -> None:
+    """Write queued registry saves, coalescing requests that arrive within the debounce window."""
+    while True:
+        registry, path = save_queue.get()
+        pending = {path: registry}
+        time.sleep(REGISTRY_SAVE_DEBOUNCE)
+        drained = 1
+        while True:
+            try:
+                registry, path = save_queue.get_nowait()
+            except queue.Empty:
+                break
+            pending[path] = registry
+            drained += 1
+        # Last registry per path wins; each save serializes its current contents.
+        # No script run owns this thread, so failures go to the log rather than st.error
+        for path, registry in pending.items():
+            try:
+                registry.write_json(path)
+            except Exception:
+                logger.exception("Background save of registry to %s failed", path)
+        for _ in range(drained):
+            save_queue.task_done()
+
+
+@st.cache_resource
+def _registry_save_queue() -> "queue.Queue[Tuple[ApiRegistry, str]]":
+    """Queue of pending registry saves, with its writer thread started once per process."""
+    save_queue: "queue.Queue[Tuple[ApiRegistry, str]]" = queue.Queue()
+    threading.Thread(
+        target=_registry_save_worker, args=(save_queue,), name="registry-saver", daemon=True
+    ).start()
+    return save_queue
+
+
+def schedule_registry_save(registry: ApiRegistry, path: str) -> None:
+    """Save the registry in the background so the UI doesn't wait on disk I/O."""
+    _registry_save_queue().put((registry, path))
+
+
+def flush_registry_saves() -> None:
+    """Block until every scheduled registry save has been written."""
+    _registry_save_queue().join()
+
+
+@st.cache_resource
+def _build_sample_apis() -> List[ApiDefinition]:
+    """
+    Build the sample investment banking API definitions once per process.
+    These are mock APIs for demonstration purposes.
+    """
+    return [
+        # Trade Booking Status API
+        ApiDefinition(
+            name="trade_booking_status",
+            description="Retrieves the current booking status of trades. Returns status information including booking state, timestamps, and any errors.",
+            url="https://mock-backoffice.internal/api/v1/trades/status",
+            method="POST",
+            input_schema={
+                "trade_ids": {"type": "list[string]", "required": True, "description": "List of trade IDs to query"},
+                "include_details": {"type": "boolean", "required": False, "description": "Whether to include detailed error messages"}
+            },
+            output_schema={
+                "trades": {"type": "list[object]", "description": "List of trade status objects"},
+                "status_fields": ["trade_id", "status", "booked_timestamp", "errors"]
+            },
+            domain="trade_lifecycle",
+            tags=["trades", "booking", "status"],
+            example_inputs={"trade_ids": ["TRD-2024-001", "TRD-2024-002"], "include_details": True}
+        ),
+        
+        # Position Reconciliation API
+        ApiDefinition(
+            name="position_reconciliation",
+            description="Performs position reconciliation between internal books and external custodian. Returns breaks and discrepancies.",
+            url="https://mock-backoffice.internal/api/v1/positions/reconcile",
+            method="POST",
+            input_schema={
+                "account_id": {"type": "string", "required": True, "description": "Account identifier"},
+                "as_of_date": {"type": "string", "required": True, "description": "Date for reconciliation in YYYY-MM-DD format"},
+                "instrument_ids": {"type": "list[string]", "required": False, "description": "Optional list of specific instruments"}
+            },
+            output_schema={
+                "summary": {"type": "object", "description": "Reconciliation summary with total breaks"},
+                "breaks": {"type": "list[object]", "description": "List of position breaks"},
+                "break_fields": ["instrument_id", "internal_quantity", "custodian_quantity", "difference"]
+            },
+            domain="reconciliation",
+            tags=["positions", "reconciliation", "breaks"],
+            example_inputs={"account_id": "ACC-12345", "as_of_date": "2024-12-06"}
+        ),
+        
+        # Settlement Status API
+        ApiDefinition(
+            name="settlement_status",
+            description="Checks settlement status for trades. Returns settlement state, expected dates, and any failures.",
+            url="https://mock-backoffice.internal/api/v1/settlements/status",
+            method="GET",
+            input_schema={
+                "trade_ids": {"type": "list[string]", "required": False, "description": "Specific trade IDs to check"},
+                "settlement_date": {"type": "string", "required": False, "description": "Filter by settlement date YYYY-MM-DD"},
+                "status_filter": {"type": "string", "required": False, "description": "Filter by status: pending, settled, failed"}
+            },
+            output_schema={
+                "settlements": {"type": "list[object]", "description": "List of settlement records"},
+                "fields": ["trade_id", "settlement_status", "expected_date", "actual_date", "failure_reason"]
+            },
+            domain="settlement",
+            tags=["settlement", "trades", "status"],
+            example_inputs={"settlement_date": "2024-12-06", "status_filter": "pending"}
+        ),
         
-        return "\n".join(context_parts)
+        # Corporate Actions API
+        ApiDefinition(
+            name="corporate_actions",
+            description="Lists corporate action events for instruments within a date range. Includes dividends, splits, mergers, etc.",
+            url="https://mock-backoffice.internal/api/v1/corporate-actions",
+            method="GET",
+            input_schema={
+                "instrument_ids": {"type": "list[string]", "required": False, "description": "Filter by instrument IDs"},
+                "start_date": {"type": "string", "required": True, "description": "Start date YYYY-MM-DD"},
+                "end_date": {"type": "string", "required": True, "description": "End date YYYY-MM-DD"},
+                "event_types": {"type": "list[string]", "required": False, "description": "Filter by event types: dividend, split, merger, spinoff"}
+            },
+            output_schema={
+                "events": {"type": "list[object]", "description": "List of corporate action events"},
+                "event_fields": ["event_id", "instrument_id", "event_type", "ex_date", "payment_date", "details"]
+            },
+            domain="corporate_actions",
+            tags=["corporate_actions", "events", "instruments"],
+            example_inputs={"start_date": "2024-12-01", "end_date": "2024-12-31", "event_types": ["dividend"]}
+        ),
+        
+        # Risk Metrics API
+        ApiDefinition(
+            name="risk_metrics",
+            description="Retrieves risk metrics snapshot for portfolios or positions. Includes VaR, Greeks, exposure metrics.",
+            url="https://mock-backoffice.internal/api/v1/risk/metrics",
+            method="POST",
+            input_schema={
+                "portfolio_ids": {"type": "list[string]", "required": False, "description": "Portfolio identifiers"},
+                "account_ids": {"type": "list[string]", "required": False, "description": "Account identifiers"},
+                "as_of_date": {"type": "string", "required": True, "description": "Date for risk calculation YYYY-MM-DD"},
+                "metrics": {"type": "list[string]", "required": False, "description": "Specific metrics to retrieve: var, delta, gamma, vega, exposure"}
+            },
+            output_schema={
+                "risk_data": {"type": "list[object]", "description": "Risk metrics by portfolio/account"},
+                "metric_fields": ["entity_id", "var_95", "delta", "gamma", "vega", "total_exposure"]
+            },
+            domain="risk",
+            tags=["risk", "metrics", "var", "greeks"],
+            example_inputs={"portfolio_ids": ["PORT-001"], "as_of_date": "2024-12-06", "metrics": ["var", "delta"]}
+        ),
+    ]
+
+
+@st.cache_resource(show_spinner=False)
+def _load_api_definitions(path: str, mtime: float) -> List[ApiDefinition]:
+    """
+    Parse a registry file into API definitions.
+    Keyed on the file's mtime so an edited file is re-read; otherwise every
+    session reuses the parsed (immutable) definitions.
+    """
+    with open(path, 'rb') as f:
+        data = orjson.loads(f.read())
+    return [ApiDefinition(**api_dict) for api_dict in data.get('apis', [])]
 
 
 def initialize_sample_apis() -> ApiRegistry:
     """
-    Pre-populate the registry with sample investment banking APIs.
-    These are mock APIs for demonstration purposes.
+    Pre-populate a fresh registry with the shared sample API definitions.
+    The definitions are built once; each session gets its own registry.
     """
     registry = ApiRegistry()
-    
-    # Trade Booking Status API
-    registry.add_api(ApiDefinition(
-        name="trade_booking_status",
-        description="Retrieves the current booking status of trades. Returns status information including booking state, timestamps, and any errors.",
-        url="https://mock-backoffice.internal/api/v1/trades/status",
-        method="POST",
-        input_schema={
-            "trade_ids": {"type": "list[string]", "required": True, "description": "List of trade IDs to query"},
-            "include_details": {"type": "boolean", "required": False, "description": "Whether to include detailed error messages"}
-        },
-        output_schema={
-            "trades": {"type": "list[object]", "description": "List of trade status objects"},
-            "status_fields": ["trade_id", "status", "booked_timestamp", "errors"]
-        },
-        domain="trade_lifecycle",
-        tags=["trades", "booking", "status"],
-        example_inputs={"trade_ids": ["TRD-2024-001", "TRD-2024-002"], "include_details": True}
-    ))
-    
-    # Position Reconciliation API
-    registry.add_api(ApiDefinition(
-        name="position_reconciliation",
-        description="Performs position reconciliation between internal books and external custodian. Returns breaks and discrepancies.",
-        url="https://mock-backoffice.internal/api/v1/positions/reconcile",
-        method="POST",
-        input_schema={
-            "account_id": {"type": "string", "required": True, "description": "Account identifier"},
-            "as_of_date": {"type": "string", "required": True, "description": "Date for reconciliation in YYYY-MM-DD format"},
-            "instrument_ids": {"type": "list[string]", "required": False, "description": "Optional list of specific instruments"}
-        },
-        output_schema={
-            "summary": {"type": "object", "description": "Reconciliation summary with total breaks"},
-            "breaks": {"type": "list[object]", "description": "List of position breaks"},
-            "break_fields": ["instrument_id", "internal_quantity", "custodian_quantity", "difference"]
-        },
-        domain="reconciliation",
-        tags=["positions", "reconciliation", "breaks"],
-        example_inputs={"account_id": "ACC-12345", "as_of_date": "2024-12-06"}
-    ))
-    
-    # Settlement Status API
-    registry.add_api(ApiDefinition(
-        name="settlement_status",
-        description="Checks settlement status for trades. Returns settlement state, expected dates, and any failures.",
-        url="https://mock-backoffice.internal/api/v1/settlements/status",
-        method="GET",
-        input_schema={
-            "trade_ids": {"type": "list[string]", "required": False, "description": "Specific trade IDs to check"},
-            "settlement_date": {"type": "string", "required": False, "description": "Filter by settlement date YYYY-MM-DD"},
-            "status_filter": {"type": "string", "required": False, "description": "Filter by status: pending, settled, failed"}
-        },
-        output_schema={
-            "settlements": {"type": "list[object]", "description": "List of settlement records"},
-            "fields": ["trade_id", "settlement_status", "expected_date", "actual_date", "failure_reason"]
-        },
-        domain="settlement",
-        tags=["settlement", "trades", "status"],
-        example_inputs={"settlement_date": "2024-12-06", "status_filter": "pending"}
-    ))
-    
-    # Corporate Actions API
-    registry.add_api(ApiDefinition(
-        name="corporate_actions",
-        description="Lists corporate action events for instruments within a date range. Includes dividends, splits, mergers, etc.",
-        url="https://mock-backoffice.internal/api/v1/corporate-actions",
-        method="GET",
-        input_schema={
-            "instrument_ids": {"type": "list[string]", "required": False, "description": "Filter by instrument IDs"},
-            "start_date": {"type": "string", "required": True, "description": "Start date YYYY-MM-DD"},
-            "end_date": {"type": "string", "required": True, "description": "End date YYYY-MM-DD"},
-            "event_types": {"type": "list[string]", "required": False, "description": "Filter by event types: dividend, split, merger, spinoff"}
-        },
-        output_schema={
-            "events": {"type": "list[object]", "description": "List of corporate action events"},
-            "event_fields": ["event_id", "instrument_id", "event_type", "ex_date", "payment_date", "details"]
-        },
-        domain="corporate_actions",
-        tags=["corporate_actions", "events", "instruments"],
-        example_inputs={"start_date": "2024-12-01", "end_date": "2024-12-31", "event_types": ["dividend"]}
-    ))
-    
-    # Risk Metrics API
-    registry.add_api(ApiDefinition(
-        name="risk_metrics",
-        description="Retrieves risk metrics snapshot for portfolios or positions. Includes VaR, Greeks, exposure metrics.",
-        url="https://mock-backoffice.internal/api/v1/risk/metrics",
-        method="POST",
-        input_schema={
-            "portfolio_ids": {"type": "list[string]", "required": False, "description": "Portfolio identifiers"},
-            "account_ids": {"type": "list[string]", "required": False, "description": "Account identifiers"},
-            "as_of_date": {"type": "string", "required": True, "description": "Date for risk calculation YYYY-MM-DD"},
-            "metrics": {"type": "list[string]", "required": False, "description": "Specific metrics to retrieve: var, delta, gamma, vega, exposure"}
-        },
-        output_schema={
-            "risk_data": {"type": "list[object]", "description": "Risk metrics by portfolio/account"},
-            "metric_fields": ["entity_id", "var_95", "delta", "gamma", "vega", "total_exposure"]
-        },
-        domain="risk",
-        tags=["risk", "metrics", "var", "greeks"],
-        example_inputs={"portfolio_ids": ["PORT-001"], "as_of_date": "2024-12-06", "metrics": ["var", "delta"]}
-    ))
-    
+    for api_def in _build_sample_apis():
+        registry.add_api(api_def)
     return registry
 
 
+@st.cache_resource(show_spinner=False)
+def _seed_registry(registry_mtime: Optional[float]) -> ApiRegistry:
+    """
+    Build the starting registry (sample APIs, then the registry file) once per file version.
+    Sessions take a copy, so their own additions stay session-local.
+    """
+    registry = initialize_sample_apis()
+    registry.load_from_json(REGISTRY_FILE_PATH)
+    return registry
+
+
+def _registry_file_mtime() -> Optional[float]:
+    """Modification time of the registry file, or None if it doesn't exist yet."""
+    try:
+        return os.path.getmtime(REGISTRY_FILE_PATH)
+    except OSError:
+        return None
+
+
 # ============================================================================
 # HTTP EXECUTION LAYER
 # ============================================================================
 
-def execute_rest_api(api_def: ApiDefinition, resolved_inputs: Dict[str, Any]) -> Dict[str, Any]:
+class LazyJSON:
     """
-    Execute a REST API call based on the API definition and resolved inputs.
+    Raw JSON response body that is only parsed when first accessed.
+    
+    Steps whose output is never read (or only partially read via project())
+    skip the full decode, and copies share the immutable bytes.
+    """
+    
+    __slots__ = ("raw", "_value", "_parsed")
+    
+    def __init__(self, raw: bytes):
+        self.raw = raw
+        self._value: Any = None
+        self._parsed = False
+    
+    @property
+    def value(self) -> Any:
+        """Parsed body, decoded once; malformed bodies fall back to the text."""
+        if not self._parsed:
+            try:
+                self._value = orjson.loads(self.raw)
+            except orjson.JSONDecodeError:
+                self._value = self.raw.decode("utf-8", errors="replace")
+            self._parsed = True
+        return self._value
+    
+    def parse(self) -> Any:
+        """Parse the body now, raising orjson.JSONDecodeError if it is malformed."""
+        if not self._parsed:
+            self._value = orjson.loads(self.raw)
+            self._parsed = True
+        return self._value
+    
+    def project(self, keys: Any) -> Any:
+        """Return only the given top-level keys (the whole value if none of them match)."""
+        value = self.value
+        if not isinstance(value, dict):
+            return value
+        projected = {key: value[key] for key in keys if key in value}
+        return projected or value
+    
+    def __getitem__(self, key: Any) -> Any:
+        return self.value[key]
+    
+    def __iter__(self):
+        return iter(self.value)
+    
+    def __len__(self) -> int:
+        return len(self.value)
+    
+    def get(self, key: Any, default: Any = None) -> Any:
+        value = self.value
+        return value.get(key, default) if isinstance(value, dict) else default
+    
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "LazyJSON":
+        # bytes are immutable, so a copy only needs a fresh parse slot
+        return LazyJSON(self.raw)
+    
+    def __reduce__(self):
+        # Serialized state (checkpoints, process boundaries) carries only the bytes
+        return (LazyJSON, (self.raw,))
+
+
+def _response_text(data: Any) -> str:
+    """Text of a response for prompts: raw JSON bodies are spliced in as-is, not re-encoded."""
+    if isinstance(data, LazyJSON):
+        return data.raw.decode("utf-8", errors="replace")
+    return _dumps_pretty(data)
+
+
+def _plain(data: Any) -> Any:
+    """Materialize a LazyJSON payload into plain Python objects."""
+    return data.value if isinstance(data, LazyJSON) else data
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache of successful JSON responses with per-entry expiry.
+    Values are deep-copied in and out so callers can never mutate a cached entry.
+    """
+    
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Any, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Any) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached value, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return copy.deepcopy(value)
+    
+    def put(self, key: Any, value: Dict[str, Any], ttl: float) -> None:
+        """Store a copy of value for ttl seconds, evicting least recently used entries."""
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+# Process-wide cache for GET responses, keyed by (url, canonical inputs)
+_response_cache = ResponseCache()
+
+
+class CircuitState(Enum):
+    """Circuit breaker states."""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is refused because the host's circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Per-host circuit breaker.
+    
+    Opens after consecutive failures, fails fast while open, and lets a single
+    trial call through once the reset timeout has elapsed.
+    """
+    
+    def __init__(self, failure_threshold: int = BREAKER_FAILURE_THRESHOLD, reset_timeout: float = BREAKER_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+    
+    def allow(self) -> bool:
+        """Return True if a call may proceed right now."""
+        with self._lock:
+            if self.state is CircuitState.CLOSED:
+                return True
+            if self.state is CircuitState.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self.state = CircuitState.HALF_OPEN
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+    
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = CircuitState.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+    
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self.state is CircuitState.HALF_OPEN or self._failures >= self.failure_threshold:
+                self.state = CircuitState.OPEN
+                self._opened_at = time.monotonic()
+
+
+_breakers: Dict[str, CircuitBreaker] = defaultdict(CircuitBreaker)
+_breakers_lock = threading.Lock()
+
+
+def _host_breaker(host: str) -> CircuitBreaker:
+    """Return the circuit breaker for a host."""
+    with _breakers_lock:
+        return _breakers[host]
+
+
+def _is_retryable_status(status_code: int) -> bool:
+    """Rate limiting and server errors are transient; other 4xx are not."""
+    return status_code == 429 or status_code >= 500
+
+
+def _query_params(api_def: ApiDefinition, resolved_inputs: Dict[str, Any]) -> Dict[str, Any]:
+    """GET sends inputs as query parameters."""
+    return {"params": resolved_inputs}
+
+
+def _json_body(api_def: ApiDefinition, resolved_inputs: Dict[str, Any]) -> Dict[str, Any]:
+    """Other methods send a pre-encoded JSON body (DEFAULT_HEADERS carries the Content-Type)."""
+    return {"data": orjson.dumps(resolved_inputs, default=_json_default)}
+
+
+# Request-argument builder per supported HTTP method
+_METHOD_TABLE: Dict[str, Callable[[ApiDefinition, Dict[str, Any]], Dict[str, Any]]] = {
+    "GET": _query_params,
+    "POST": _json_body,
+    "PUT": _json_body,
+    "DELETE": _json_body,
+}
+
+
+# Resolved-input key carrying the output fields a step needs (see _projection_fields)
+PROJECTION_INPUT = "_projection"
+
+
+def _request_args(
+    api_def: ApiDefinition,
+    build_request: Callable[[ApiDefinition, Dict[str, Any]], Dict[str, Any]],
+    resolved_inputs: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Build request arguments, turning a projection input into the API's field-selection param."""
+    projection = resolved_inputs.get(PROJECTION_INPUT)
+    if not projection:
+        return build_request(api_def, resolved_inputs)
+    
+    inputs = {name: value for name, value in resolved_inputs.items() if name != PROJECTION_INPUT}
+    request_args = build_request(api_def, inputs)
+    request_args["params"] = {**(request_args.get("params") or {}), api_def.projection_param: ",".join(projection)}
+    return request_args
+
+
+def _response_cache_key(api_def: ApiDefinition, resolved_inputs: Dict[str, Any]) -> Optional[Tuple[str, bytes]]:
+    """Cache key for a cacheable GET call, or None if the call must always hit the network."""
+    if api_def.method == "GET" and api_def.cacheable:
+        return (api_def.url, orjson.dumps(resolved_inputs, option=orjson.OPT_SORT_KEYS, default=str))
+    return None
+
+
+def _success_result(
+    api_def: ApiDefinition,
+    cache_key: Optional[Tuple[str, bytes]],
+    status_code: int,
+    content_type: str,
+    content: bytes
+) -> Dict[str, Any]:
+    """Shape a successful response; JSON results are cached when cache_key is set."""
+    try:
+        # JSON bodies stay as raw bytes until a consumer reads them, unless they are about
+        # to be cached: only parsable bodies may be cached, so those are parsed (once) here
+        data = LazyJSON(content) if "json" in content_type else orjson.loads(content)
+        if cache_key is not None and isinstance(data, LazyJSON):
+            data.parse()
+    except orjson.JSONDecodeError:
+        return {
+            "success": True,
+            "status_code": status_code,
+            "data": content.decode("utf-8", errors="replace")
+        }
+    
+    result = {
+        "success": True,
+        "status_code": status_code,
+        "data": data
+    }
+    if cache_key is not None:
+        _response_cache.put(cache_key, result, api_def.cache_ttl)
+    return result
+
+
+def _reason_phrase(status_code: int) -> str:
+    """Standard reason phrase for a status code (aiohttp only hands back the number here)."""
+    try:
+        return HTTPStatus(status_code).phrase
+    except ValueError:
+        return f"HTTP {status_code}"
+
+
+def _http_error_result(status_code: int, reason: str, content: bytes) -> Dict[str, Any]:
+    """Shape a 4xx/5xx response, keeping the start of the body for diagnosis."""
+    return {
+        "success": False,
+        "status_code": status_code,
+        "error": f"HTTP {status_code}: {reason}",
+        "error_type": "http4xx" if status_code < 500 else "http5xx",
+        "body": content[:HTTP_ERROR_BODY_BYTES].decode("utf-8", errors="replace")
+    }
+
+
+def _unexpected_error_result(e: Exception) -> Dict[str, Any]:
+    """
+    Shape an unexpected failure. In debug mode the exception info is kept
+    (not formatted) so get_traceback can render it only if someone looks.
+    """
+    result = {
+        "success": False,
+        "error": f"Unexpected error: {str(e)}",
+        "error_type": "unknown"
+    }
+    if DEBUG_TRACEBACKS:
+        result["exc_info"] = sys.exc_info()
+    return result
+
+
+class AsyncHttpRuntime:
+    """
+    Background event loop owning one aiohttp session for the whole process.
+    
+    Streamlit runs scripts on worker threads without a loop, so calls are
+    submitted to this loop; the session's connection pool survives across plans.
+    """
+    
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, name="api-http-loop", daemon=True).start()
+        self.session = self.run(self._create_session())
+        # Per-host bulkheads live on the loop, alongside the shared circuit breakers
+        self._bulkheads: Dict[str, asyncio.Semaphore] = defaultdict(lambda: asyncio.Semaphore(BULKHEAD_SIZE))
+    
+    @staticmethod
+    async def _create_session() -> "aiohttp.ClientSession":
+        import aiohttp
+        
+        return aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=ASYNC_CONNECTION_LIMIT, ttl_dns_cache=300),
+            timeout=aiohttp.ClientTimeout(sock_connect=HTTP_TIMEOUT[0], sock_read=HTTP_TIMEOUT[1]),
+            headers=DEFAULT_HEADERS
+        )
+    
+    def run(self, coro: Any) -> Any:
+        """Run a coroutine on the background loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+    
+    async def send(self, method: str, url: str, **kwargs: Any) -> Tuple[int, str, bytes]:
+        """
+        Send a request through the host's bulkhead and circuit breaker.
+        
+        Failures to connect are retried for every method. Idempotent methods are
+        also retried on timeouts, dropped connections, 429 and 5xx responses; a
+        POST that reached the server is never resent. Retries use exponential
+        backoff with full jitter, and the last response or error is surfaced.
+        
+        Returns:
+            (status code, content type, body bytes) of the final attempt
+        
+        Raises:
+            CircuitOpenError: If the host's circuit is open
+        """
+        import aiohttp
+        
+        host = urlsplit(url).netloc
+        breaker = _host_breaker(host)
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        # The request was never sent, so these are safe to retry for any method
+        connect_errors = (
+            aiohttp.ClientConnectorError,
+            getattr(aiohttp, "ConnectionTimeoutError", aiohttp.ClientConnectorError)  # aiohttp >= 3.10
+        )
+        for attempt in range(MAX_RETRIES + 1):
+            if not breaker.allow():
+                raise CircuitOpenError(f"Circuit open for {host}")
+            
+            try:
+                async with self._bulkheads[host]:
+                    async with self.session.request(method, url, **kwargs) as response:
+                        content = await response.read()
+                        status = response.status
+                        content_type = response.headers.get("Content-Type", "")
+            except connect_errors:
+                breaker.record_failure()
+                if attempt == MAX_RETRIES:
+                    raise
+            except (asyncio.TimeoutError, aiohttp.ClientConnectionError):
+                breaker.record_failure()
+                if attempt == MAX_RETRIES or not idempotent:
+                    raise
+            except Exception:
+                breaker.record_failure()
+                raise
+            else:
+                if not _is_retryable_status(status):
+                    breaker.record_success()
+                    return status, content_type, content
+                breaker.record_failure()
+                if attempt == MAX_RETRIES or not idempotent:
+                    return status, content_type, content
+            
+            await asyncio.sleep(min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt) * random.random())
+
+
+@st.cache_resource
+def get_async_http() -> AsyncHttpRuntime:
+    """Shared async HTTP runtime for all API calls in this process."""
+    return AsyncHttpRuntime()
+
+
+def _aiohttp_query(params: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """Encode query params the way requests does: lists repeat the key, None is dropped."""
+    items = []
+    for key, value in params.items():
+        for item in value if isinstance(value, (list, tuple)) else [value]:
+            if item is not None:
+                items.append((key, str(item)))
+    return items
+
+
+async def execute_rest_api_async(
+    api_def: ApiDefinition,
+    resolved_inputs: Dict[str, Any],
+    runtime: AsyncHttpRuntime
+) -> Dict[str, Any]:
+    """
+    Execute a REST API call on the shared aiohttp session.
     
     Args:
         api_def: The API definition from the registry
         resolved_inputs: Dictionary of input parameters with resolved values
+        runtime: The shared async HTTP runtime
         
     Returns:
         Dictionary containing the response data or error information
     """
+    import aiohttp
+    
     try:
-        # Build request parameters
-        headers = {
-            "Content-Type": "application/json",
-            "Accept": "application/json"
-            # Extension point: Add authentication headers here
-            # "Authorization": f"Bearer {token}"
-        }
-        
-        # Prepare request based on HTTP method
-        method = api_def.method.upper()
-        url = api_def.url
-        
-        if method == "GET":
-            response = requests.get(url, params=resolved_inputs, headers=headers, timeout=30)
-        elif method == "POST":
-            response = requests.post(url, json=resolved_inputs, headers=headers, timeout=30)
-        elif method == "PUT":
-            response = requests.put(url, json=resolved_inputs, headers=headers, timeout=30)
-        elif method == "DELETE":
-            response = requests.delete(url, json=resolved_inputs, headers=headers, timeout=30)
-        else:
+        method = api_def.method
+        build_request = _METHOD_TABLE.get(method)
+        if build_request is None:
             return {"error": f"Unsupported HTTP method: {method}"}
         
-        # Parse response
-        response.raise_for_status()
+        cache_key = _response_cache_key(api_def, resolved_inputs)
+        if cache_key is not None:
+            cached = _response_cache.get(cache_key)
+            if cached is not None:
+                return cached
         
-        try:
-            return {
-                "success": True,
-                "status_code": response.status_code,
-                "data": response.json()
-            }
-        except json.JSONDecodeError:
-            return {
-                "success": True,
-                "status_code": response.status_code,
-                "data": response.text
-            }
+        request_args = _request_args(api_def, build_request, resolved_inputs)
+        if "params" in request_args:
+            request_args["params"] = _aiohttp_query(request_args["params"])
+        status_code, content_type, content = await runtime.send(method, api_def.url, **request_args)
+        
+        if status_code >= 400:
+            return _http_error_result(status_code, _reason_phrase(status_code), content)
+        return _success_result(api_def, cache_key, status_code, content_type, content)
     
-    except requests.exceptions.Timeout:
+    except CircuitOpenError as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "error_type": "circuit_open"
+        }
+    except asyncio.TimeoutError:
         return {
             "success": False,
             "error": "Request timeout",
             "error_type": "timeout"
         }
-    except requests.exceptions.ConnectionError:
+    except aiohttp.ClientConnectionError:
         return {
             "success": False,
             "error": "Connection error - could not reach API endpoint",
             "error_type": "connection"
         }
-    except requests.exceptions.HTTPError as e:
-        return {
-            "success": False,
-            "error": f"HTTP error: {str(e)}",
-            "status_code": response.status_code,
-            "error_type": "http"
-        }
     except Exception as e:
-        return {
-            "success": False,
-            "error": f"Unexpected error: {str(e)}",
-            "error_type": "unknown",
-            "traceback": traceback.format_exc()
-        }
+        return _unexpected_error_result(e)
+
+
+def execute_rest_apis(calls: List[Tuple[ApiDefinition, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Execute independent REST API calls concurrently on the shared event loop.
+    
+    Args:
+        calls: List of (API definition, resolved inputs) pairs
+        
+    Returns:
+        List of results in the same order as the calls
+    """
+    if not calls:
+        return []
+    
+    runtime = get_async_http()
+    
+    async def gather_calls() -> List[Dict[str, Any]]:
+        return await asyncio.gather(
+            *(execute_rest_api_async(api_def, resolved_inputs, runtime) for api_def, resolved_inputs in calls)
+        )
+    
+    return runtime.run(gather_calls())
 
 
 # ============================================================================
@@ -441,31 +1332,45 @@ class AgentState(TypedDict):
     api_registry_context: str
     plan: List[Dict[str, Any]]
     plan_reasoning: str
-    execution_results: List[Dict[str, Any]]
+    execution_results: List["ExecutionResult"]
     final_summary: str
     error: Optional[str]
+    skip_summary: NotRequired[bool]  # Set by execution_node when final_summary is already the answer
 
 
-def planning_node(state: AgentState) -> AgentState:
+@dataclass(slots=True)
+class ExecutionResult:
+    """Outcome of one executed (or skipped) plan step."""
+    step: int
+    api_name: str
+    api_url: str = ""
+    api_method: str = ""
+    inputs: Dict[str, Any] = field(default_factory=dict)
+    rationale: str = ""
+    success: bool = False
+    status_code: Optional[int] = None
+    data: Any = None
+    error: Optional[str] = None
+    error_type: Optional[str] = None
+    exc_info: Optional[Tuple[Any, Any, Any]] = None  # Captured in debug mode; see get_traceback
+    body: Optional[str] = None  # Start of the response body for HTTP errors
+
+
+@st.cache_data(show_spinner=False)
+def build_planning_prompt(context_hash: str, _api_context: str) -> str:
     """
-    Planning node: Uses LLM to analyze query and create execution plan.
+    Assemble the static planning prompt (role, registry and instructions) for a registry snapshot.
     
-    This node:
-    1. Takes user query and API registry
-    2. Uses LLM to determine which APIs to call and in what order
-    3. Produces a structured plan with reasoning
+    Keyed on the registry's content hash only, so the large context string is never
+    re-hashed and every query in the session shares one byte-identical prefix,
+    which is what provider-side prompt caching matches on. The user query is sent
+    separately after it.
     """
-    user_query = state["user_query"]
-    api_context = state["api_registry_context"]
-    
-    # Construct planning prompt
-    planning_prompt = f"""You are an API orchestration planning agent for an investment banking back-office system.
+    return f"""You are an API orchestration planning agent for an investment banking back-office system.
 
 Your task is to analyze the user's query and create a detailed execution plan using the available APIs.
 
-{api_context}
-
-User Query: {user_query}
+{_api_context}
 
 Instructions:
 1. Analyze the user's query to understand what information they need
@@ -496,28 +1401,63 @@ Instructions:
 
 Ensure your response is valid JSON that can be parsed. Be specific about input values and their sources.
 """
+
+
+def planning_node(state: AgentState) -> AgentState:
+    """
+    Planning node: Uses LLM to analyze query and create execution plan.
     
+    This node:
+    1. Takes user query and API registry
+    2. Uses LLM to determine which APIs to call and in what order
+    3. Produces a structured plan with reasoning
+    """
+    # Static prefix (cached per registry snapshot) first, then the per-query part
+    registry = st.session_state.registry
+    planning_prompt = build_planning_prompt(registry.context_hash, registry.to_llm_context())
+    
+    if LLM_PROVIDER == "anthropic":
+        system_content: Any = [
+            {"type": "text", "text": PLANNER_SYSTEM_PROMPT},
+            {"type": "text", "text": planning_prompt, "cache_control": PROMPT_CACHE_CONTROL}
+        ]
+    else:
+        # Plain string with the same byte-identical prefix on every query
+        system_content = f"{PLANNER_SYSTEM_PROMPT}\n\n{planning_prompt}"
     messages = [
-        {"role": "system", "content": "You are an expert API orchestration planner. Always respond with valid JSON."},
-        {"role": "user", "content": planning_prompt}
+        {"role": "system", "content": system_content},
+        {"role": "user", "content": f"User Query: {state['user_query']}"}
     ]
     
+    llm_response = ""
     try:
-        llm_response = llm_chat(messages, temperature=0.3)
-        
-        # Parse the JSON response
-        # Try to extract JSON from the response (in case LLM adds extra text)
-        json_start = llm_response.find('{')
-        json_end = llm_response.rfind('}') + 1
-        if json_start >= 0 and json_end > json_start:
-            json_str = llm_response[json_start:json_end]
-            parsed_plan = json.loads(json_str)
+        # Stream the response and parse the plan as soon as its JSON object closes,
+        # ignoring any trailer text the LLM keeps emitting
+        scanner = JsonEnvelopeScanner()
+        json_str = None
+        stream = llm_chat_stream(messages, temperature=0.3)
+        for chunk in stream:
+            json_str = scanner.feed(chunk)
+            if json_str is not None:
+                stream.close()
+                break
+        llm_response = scanner.text()
+        
+        if json_str is not None:
+            parsed_plan = orjson.loads(json_str)
         else:
-            parsed_plan = json.loads(llm_response)
+            # No balanced object arrived; fall back to the outermost braces
+            json_start = llm_response.find('{')
+            json_end = llm_response.rfind('}') + 1
+            if json_start >= 0 and json_end > json_start:
+                parsed_plan = orjson.loads(llm_response[json_start:json_end])
+            else:
+                parsed_plan = orjson.loads(llm_response)
         
         state["plan"] = parsed_plan.get("plan", [])
         state["plan_reasoning"] = parsed_plan.get("reasoning", "")
         state["error"] = None
+        _record_plan(state["plan"])
         
     except json.JSONDecodeError as e:
         state["error"] = f"Failed to parse LLM planning response as JSON: {str(e)}"
@@ -531,120 +1471,247 @@ Ensure your response is valid JSON that can be parsed. Be specific about input v
     return state
 
 
+def _source_step(source: Any) -> Optional[int]:
+    """Return N for a 'step_N' input source, or None for any other source."""
+    if isinstance(source, str) and source.startswith("step_"):
+        try:
+            return int(source.split("_")[1])
+        except ValueError:
+            return None
+    return None
+
+
+# Kinds of compiled plan inputs
+INPUT_CONSTANT = 0  # payload is the value
+INPUT_STEP = 1  # payload is (source step number, fallback value)
+
+
+def _compile_inputs(step: Dict[str, Any]) -> List[Tuple[str, int, Any]]:
+    """
+    Parse a plan step's input spec once into (name, kind, payload) tuples,
+    so resolution needs no dict lookups or source-string parsing.
+    """
+    compiled = []
+    for param_name, param_info in step.get("inputs", {}).items():
+        if isinstance(param_info, dict):
+            value = param_info.get("value")
+            source_step = _source_step(param_info.get("source", "constant"))
+            if source_step is not None:
+                compiled.append((param_name, INPUT_STEP, (source_step, value)))
+            else:
+                compiled.append((param_name, INPUT_CONSTANT, value))
+        else:
+            compiled.append((param_name, INPUT_CONSTANT, param_info))
+    return compiled
+
+
+def _step_dependencies(compiled_inputs: List[Tuple[str, int, Any]]) -> set:
+    """Return the step numbers whose outputs a compiled plan step consumes."""
+    return {payload[0] for _, kind, payload in compiled_inputs if kind == INPUT_STEP}
+
+
+def _resolve_step_inputs(
+    compiled_inputs: List[Tuple[str, int, Any]],
+    step_outputs: Dict[int, "ExecutionResult"]
+) -> Dict[str, Any]:
+    """Resolve a compiled step's inputs from constants or previous step outputs."""
+    resolved_inputs = {}
+    for param_name, kind, payload in compiled_inputs:
+        if kind == INPUT_CONSTANT:
+            resolved_inputs[param_name] = payload
+        else:
+            # Extract from previous step output, falling back to the specified value
+            source_output = step_outputs.get(payload[0])
+            resolved_inputs[param_name] = _plain(source_output.data) if source_output is not None else payload[1]
+    return resolved_inputs
+
+
+def _mentioned_fields(step: Dict[str, Any]) -> set:
+    """Identifiers a step's expected_outputs/output_usage mention, matched as whole words."""
+    text = f"{step.get('expected_outputs', '')} {step.get('output_usage', '')}"
+    return set(re.findall(r"[A-Za-z_][A-Za-z0-9_]*", text))
+
+
+def _summary_fields(step: Dict[str, Any], api_def: Optional[ApiDefinition], value: Any) -> List[str]:
+    """
+    Response keys to keep in the summary prompt; empty means send the whole body.
+    Only trims when the step names declared output fields and the response has every one.
+    """
+    if api_def is None or not isinstance(value, dict):
+        return []
+    mentioned = _mentioned_fields(step)
+    requested = [name for name in api_def.output_schema if name in mentioned]
+    if not requested or any(name not in value for name in requested):
+        return []
+    return requested
+
+
+def _projection_fields(step: Dict[str, Any], api_def: ApiDefinition) -> List[str]:
+    """
+    Output fields a step's expected_outputs/output_usage mention, for APIs that can
+    return a subset of fields. Empty means fetch everything.
+    """
+    if not api_def.supports_projection:
+        return []
+    mentioned = _mentioned_fields(step)
+    return [name for name in api_def.output_schema if name in mentioned]
+
+
 def execution_node(state: AgentState) -> AgentState:
     """
     Execution node: Executes the planned sequence of API calls.
     
     This node:
-    1. Iterates through each step in the plan
+    1. Orders the plan into dependency levels (steps in a level are independent)
     2. Resolves inputs (from user query, constants, or previous outputs)
-    3. Executes the API call
+    3. Executes each level's API calls concurrently
     4. Stores results for use in subsequent steps
     """
     plan = state["plan"]
-    execution_results = []
     
     # Storage for outputs from previous steps
     step_outputs = {}
     
-    for step in plan:
-        step_num = step.get("step", 0)
-        api_name = step.get("api_name", "")
-        
-        # Get API definition from registry (passed via session state)
-        api_def = st.session_state.registry.get_api_by_name(api_name)
-        
-        if not api_def:
-            execution_results.append({
-                "step": step_num,
-                "api_name": api_name,
-                "success": False,
-                "error": f"API '{api_name}' not found in registry"
-            })
-            continue
-        
-        # Resolve inputs
-        resolved_inputs = {}
-        input_spec = step.get("inputs", {})
-        
-        for param_name, param_info in input_spec.items():
-            if isinstance(param_info, dict):
-                value = param_info.get("value")
-                source = param_info.get("source", "constant")
-                
-                # Handle different sources
-                if source == "constant" or source == "user_query":
-                    resolved_inputs[param_name] = value
-                elif source.startswith("step_"):
-                    # Extract from previous step output
-                    source_step = int(source.split("_")[1])
-                    if source_step in step_outputs:
-                        # Try to extract the value from previous step
-                        resolved_inputs[param_name] = step_outputs[source_step].get("data", {})
-                    else:
-                        resolved_inputs[param_name] = value  # Fallback to specified value
-                else:
-                    resolved_inputs[param_name] = value
-            else:
-                resolved_inputs[param_name] = param_info
-        
-        # Execute API call
-        result = execute_rest_api(api_def, resolved_inputs)
-        
-        # Store result
-        execution_result = {
-            "step": step_num,
-            "api_name": api_name,
-            "api_url": api_def.url,
-            "api_method": api_def.method,
-            "inputs": resolved_inputs,
-            "rationale": step.get("rationale", ""),
-            **result
-        }
+    # Input specs are parsed once per plan
+    compiled_inputs = [_compile_inputs(step) for step in plan]
+    dependencies = [_step_dependencies(compiled) for compiled in compiled_inputs]
+    
+    # Kahn-style levels: a step runs one level after the latest earlier step it consumes.
+    # Only earlier steps count, matching the sequential semantics for forward references.
+    step_levels: Dict[Any, int] = {}
+    levels: List[List[int]] = []
+    for index, step in enumerate(plan):
+        level = max(
+            (step_levels[dep] + 1 for dep in dependencies[index] if dep in step_levels),
+            default=0
+        )
+        step_levels[step.get("step", 0)] = level
+        if level == len(levels):
+            levels.append([])
+        levels[level].append(index)
+    
+    # Results are collected by plan index and emitted in plan order
+    results_by_index: Dict[int, Dict[str, Any]] = {}
+    # Steps refused by an open circuit; their dependents are skipped rather than run on stale inputs
+    circuit_open_steps = set()
+    
+    for level in levels:
+        calls = []
+        call_indexes = []
+        for index in level:
+            step = plan[index]
+            api_name = step.get("api_name", "")
+            
+            # Get API definition from registry (passed via session state)
+            api_def = st.session_state.registry.get_api_by_name(api_name)
+            
+            if not api_def:
+                results_by_index[index] = ExecutionResult(
+                    step=step.get("step", 0),
+                    api_name=api_name,
+                    error=f"API '{api_name}' not found in registry"
+                )
+                continue
+            
+            blocked_by = dependencies[index] & circuit_open_steps
+            if blocked_by:
+                circuit_open_steps.add(step.get("step", 0))
+                results_by_index[index] = ExecutionResult(
+                    step=step.get("step", 0),
+                    api_name=api_name,
+                    error=f"Skipped: depends on step(s) {sorted(blocked_by)} whose circuit is open",
+                    error_type="circuit_open"
+                )
+                continue
+            
+            resolved_inputs = _resolve_step_inputs(compiled_inputs[index], step_outputs)
+            projection = _projection_fields(step, api_def)
+            if projection:
+                resolved_inputs[PROJECTION_INPUT] = projection
+            calls.append((api_def, resolved_inputs))
+            call_indexes.append(index)
         
-        execution_results.append(execution_result)
+        # Execute the level's API calls concurrently; results come back in call order
+        results = execute_rest_apis(calls)
         
-        # Store outputs for future steps
-        if result.get("success"):
-            step_outputs[step_num] = result
-    
-    state["execution_results"] = execution_results
+        for index, (api_def, resolved_inputs), result in zip(call_indexes, calls, results):
+            step = plan[index]
+            step_num = step.get("step", 0)
+            
+            # Store result
+            execution_result = ExecutionResult(
+                step=step_num,
+                api_name=step.get("api_name", ""),
+                api_url=api_def.url,
+                api_method=api_def.method,
+                inputs=resolved_inputs,
+                rationale=step.get("rationale", ""),
+                success=result.get("success", False),
+                status_code=result.get("status_code"),
+                data=result.get("data"),
+                error=result.get("error"),
+                error_type=result.get("error_type"),
+                exc_info=result.get("exc_info"),
+                body=result.get("body")
+            )
+            results_by_index[index] = execution_result
+            
+            # Store outputs for future steps
+            if execution_result.success:
+                step_outputs[step_num] = execution_result
+            elif execution_result.error_type == "circuit_open":
+                circuit_open_steps.add(step_num)
+    
+    state["execution_results"] = [results_by_index[index] for index in range(len(plan))]
+    
+    # A single small answer is shown directly instead of paying for a summarization call
+    answer = _direct_answer(state["execution_results"])
+    state["skip_summary"] = answer is not None
+    if answer is not None:
+        state["final_summary"] = answer
     return state
 
 
-def summarization_node(state: AgentState) -> AgentState:
+def get_traceback(result: ExecutionResult) -> Optional[str]:
+    """Format a result's captured exception, if any; done only when displayed."""
+    if result.exc_info is None:
+        return None
+    return "".join(traceback.format_exception(*result.exc_info))
+
+
+def _is_small_flat_dict(data: Any) -> bool:
+    """True for a dict with a handful of scalar values."""
+    return (
+        isinstance(data, dict)
+        and 0 < len(data) <= DIRECT_ANSWER_MAX_FIELDS
+        and all(value is None or isinstance(value, (str, int, float, bool)) for value in data.values())
+    )
+
+
+def _direct_answer(execution_results: List[ExecutionResult]) -> Optional[str]:
     """
-    Summarization node: Uses LLM to create human-friendly summary.
-    
-    This node:
-    1. Takes all execution results
-    2. Uses LLM to generate a natural language summary
-    3. Formats the answer to directly address the user's query
+    Format the answer directly when the plan was one successful call returning a
+    scalar or a small flat object; returns None when an LLM summary is needed.
     """
-    user_query = state["user_query"]
-    plan = state["plan"]
-    execution_results = state["execution_results"]
-    
-    # Build context for summarization
-    results_context = []
-    for result in execution_results:
-        results_context.append(f"\nStep {result['step']}: {result['api_name']}")
-        results_context.append(f"Rationale: {result.get('rationale', 'N/A')}")
-        results_context.append(f"Inputs: {json.dumps(result.get('inputs', {}), indent=2)}")
-        if result.get('success'):
-            results_context.append(f"Response: {json.dumps(result.get('data', {}), indent=2)}")
-        else:
-            results_context.append(f"Error: {result.get('error', 'Unknown error')}")
-    
-    results_text = "\n".join(results_context)
-    
-    summarization_prompt = f"""You are an AI assistant helping users understand API execution results.
+    if len(execution_results) != 1 or not execution_results[0].success:
+        return None
+    
+    result = execution_results[0]
+    data = _plain(result.data)
+    if isinstance(data, (str, int, float, bool)):
+        return f"**{result.api_name}:** {data}"
+    if _is_small_flat_dict(data):
+        lines = [f"**{result.api_name}**", ""]
+        lines.extend(f"- **{key}:** {value}" for key, value in data.items())
+        return "\n".join(lines)
+    return None
 
-User's Original Query: {user_query}
 
-Execution Results:
-{results_text}
+_SUMMARY_PROMPT_HEAD = b"""You are an AI assistant helping users understand API execution results.
 
+User's Original Query: """
+
+_SUMMARY_PROMPT_TAIL = b"""
 Your task:
 1. Analyze the execution results from all API calls
 2. Extract key information relevant to the user's query
@@ -655,6 +1722,75 @@ Your task:
 
 Provide a comprehensive yet readable summary that a business user would understand.
 """
+
+_prompt_buffers = threading.local()
+
+
+def _prompt_buffer() -> bytearray:
+    """Return this thread's prompt buffer, emptied but keeping its allocation."""
+    buf = getattr(_prompt_buffers, "buf", None)
+    if buf is None:
+        buf = _prompt_buffers.buf = bytearray()
+    buf.clear()
+    return buf
+
+
+def summarization_node(state: AgentState) -> AgentState:
+    """
+    Summarization node: Uses LLM to create human-friendly summary.
+    
+    This node:
+    1. Takes all execution results
+    2. Uses LLM to generate a natural language summary
+    3. Formats the answer to directly address the user's query
+    """
+    user_query = state["user_query"]
+    plan = state["plan"]
+    execution_results = state["execution_results"]
+    registry = st.session_state.registry
+    
+    # Build the prompt as bytes in a reused per-thread buffer; JSON goes in straight from orjson
+    # and raw response bodies are copied in without a decode/encode round-trip
+    steps_by_number = {step.get("step"): step for step in plan}
+    buf = _prompt_buffer()
+    buf += _SUMMARY_PROMPT_HEAD
+    buf += user_query.encode()
+    buf += b"\n\nExecution Results:\n"
+    for result in execution_results:
+        buf += b"\nStep "
+        buf += str(result.step).encode()
+        buf += b": "
+        buf += result.api_name.encode()
+        buf += b"\nRationale: "
+        buf += (result.rationale or "N/A").encode()
+        buf += b"\nInputs: "
+        buf += _dumps_pretty_bytes(result.inputs)
+        buf += b"\n"
+        if result.success:
+            data = result.data
+            buf += b"Response: "
+            if isinstance(data, LazyJSON):
+                # Full body unless the plan named exactly which declared outputs it needs
+                value = data.value
+                keys = _summary_fields(
+                    steps_by_number.get(result.step, {}), registry.get_api_by_name(result.api_name), value
+                )
+                if keys and len(keys) < len(value):
+                    logger.info(
+                        "Summary prompt for step %s (%s) omits response fields %s",
+                        result.step, result.api_name, sorted(str(key) for key in value if key not in keys)
+                    )
+                    buf += _dumps_pretty_bytes(data.project(keys))
+                else:
+                    buf += data.raw
+            else:
+                buf += _dumps_pretty_bytes(data)
+        else:
+            buf += b"Error: "
+            buf += (result.error or "Unknown error").encode()
+        buf += b"\n"
+    buf += _SUMMARY_PROMPT_TAIL
+    summarization_prompt = buf.decode("utf-8", errors="replace")
     
     messages = [
         {"role": "system", "content": "You are a helpful assistant that explains technical API results in business-friendly language."},
@@ -670,24 +1806,147 @@ Provide a comprehensive yet readable summary that a business user would understa
     return state
 
 
-def create_agent_graph() -> StateGraph:
+def _record_plan(plan: List[Dict[str, Any]]) -> None:
+    """Remember the size of recent plans and whether they only read; see route_entry."""
+    registry = st.session_state.registry
+    read_only = all(
+        (api_def := registry.get_api_by_name(step.get("api_name", ""))) is not None and api_def.method == "GET"
+        for step in plan
+    )
+    recent = st.session_state.setdefault("recent_plans", [])
+    recent.append((len(plan), read_only))
+    del recent[:-5]
+
+
+def agent_loop(state: AgentState) -> AgentState:
+    """
+    Fused node: plans, executes and summarizes in one function-calling conversation.
+    
+    Each round the LLM may request tool calls; they are dispatched through
+    execution_node and their results fed back. The first reply without tool
+    calls is the final summary. Only read-only APIs are offered (see
+    ApiRegistry.to_tools), and calls naming anything else are refused, since
+    nothing here waits for the user to confirm a plan.
+    """
+    registry = st.session_state.registry
+    messages = [
+        {"role": "system", "content": (
+            "You are an API orchestration assistant for an investment banking back-office system. "
+            "Call the available tools to gather what the user needs, then answer in clear, "
+            "business-friendly language."
+        )},
+        {"role": "user", "content": state["user_query"]}
+    ]
+    tools = registry.to_tools()
+    allowed = {tool["function"]["name"] for tool in tools}
+    plan: List[Dict[str, Any]] = []
+    execution_results: List[ExecutionResult] = []
+    state["final_summary"] = ""
+    
+    for _ in range(MAX_AGENT_TURNS):
+        message = llm_chat_tools(messages, tools, temperature=0.3)
+        tool_calls = message.get("tool_calls") or []
+        if not tool_calls:
+            state["final_summary"] = message.get("content", "")
+            break
+        messages.append({"role": "assistant", "content": message.get("content"), "tool_calls": tool_calls})
+        
+        # Tool calls within one reply are independent, so they form a single plan level
+        turn_plan = []
+        refused = {}
+        for index, tool_call in enumerate(tool_calls):
+            function = tool_call.get("function", {})
+            if function.get("name") not in allowed:
+                refused[index] = f"'{function.get('name')}' is not an available read-only API"
+                continue
+            try:
+                arguments = orjson.loads(function.get("arguments") or "{}")
+            except orjson.JSONDecodeError:
+                arguments = {}
+            turn_plan.append({
+                "step": len(plan) + len(turn_plan) + 1,
+                "api_name": function.get("name", ""),
+                "rationale": "Requested by the assistant via tool call",
+                "inputs": {name: {"value": value, "source": "constant"} for name, value in arguments.items()}
+            })
+        
+        state["plan"] = turn_plan
+        results = iter(execution_node(state)["execution_results"] if turn_plan else [])
+        plan.extend(turn_plan)
+        
+        for index, tool_call in enumerate(tool_calls):
+            if index in refused:
+                content = _dumps_pretty({"error": refused[index]})
+                messages.append({"role": "tool", "tool_call_id": tool_call.get("id"), "content": content})
+                continue
+            result = next(results)
+            execution_results.append(result)
+            if result.success:
+                content = _response_text(result.data)
+            else:
+                content = _dumps_pretty({"error": result.error or "Unknown error"})
+            messages.append({"role": "tool", "tool_call_id": tool_call.get("id"), "content": content})
+    else:
+        state["final_summary"] = ""
+        state["error"] = f"Agent did not finish within {MAX_AGENT_TURNS} tool-call rounds"
+    
+    state["plan"] = plan
+    state["execution_results"] = execution_results
+    _record_plan(plan)
+    return state
+
+
+def route_entry(state: AgentState) -> str:
+    """
+    Pick where the graph starts: execution for a confirmed plan, otherwise planning,
+    or the fused agent loop when it can answer without a confirmation step.
+    
+    Fused mode saves an LLM round-trip but exposes every read-only API as a tool, so
+    it is only used for small registries in sessions whose recent plans were short
+    and made no mutating calls.
+    """
+    if state.get("plan"):
+        return "execution"
+    recent = st.session_state.get("recent_plans", [])
+    if (
+        len(st.session_state.registry.apis) < FUSED_MODE_MAX_APIS
+        and recent
+        and all(read_only and steps <= FUSED_MODE_MAX_PLAN_STEPS for steps, read_only in recent)
+    ):
+        return "fused"
+    return "planning"
+
+
+def create_agent_graph() -> "StateGraph":
     """
     Create the LangGraph workflow for the API selector agent.
     
-    Workflow:
-    Start -> Planning -> Execution -> Summarization -> End
+    Workflow (see route_entry; the user confirms the plan between the two runs):
+    Start -> Planning -> End                                  (new query)
+    Start -> Execution -> Summarization -> End                (confirmed plan)
+    Start -> Agent loop -> End                                (fused, read-only)
     """
+    from langgraph.graph import StateGraph, END
+    
     workflow = StateGraph(AgentState)
     
     # Add nodes
     workflow.add_node("planning", planning_node)
     workflow.add_node("execution", execution_node)
     workflow.add_node("summarization", summarization_node)
+    workflow.add_node("agent_loop", agent_loop)
     
     # Define edges
-    workflow.set_entry_point("planning")
-    workflow.add_edge("planning", "execution")
-    workflow.add_edge("execution", "summarization")
+    workflow.set_conditional_entry_point(
+        route_entry, {"planning": "planning", "execution": "execution", "fused": "agent_loop"}
+    )
+    workflow.add_edge("planning", END)
+    workflow.add_edge("agent_loop", END)
+    workflow.add_conditional_edges(
+        "execution",
+        lambda state: END if state.get("skip_summary") else "summarization",
+        {END: END, "summarization": "summarization"}
+    )
     workflow.add_edge("summarization", END)
     
     return workflow.compile()
@@ -700,9 +1959,8 @@ def create_agent_graph() -> StateGraph:
 def init_session_state():
     """Initialize Streamlit session state variables."""
     if 'registry' not in st.session_state:
-        st.session_state.registry = initialize_sample_apis()
-        # Try to load from file if exists
-        st.session_state.registry.load_from_json(REGISTRY_FILE_PATH)
+        # Seeded once per registry file version; each session edits its own copy
+        st.session_state.registry = _seed_registry(_registry_file_mtime()).copy()
     
     if 'current_plan' not in st.session_state:
         st.session_state.current_plan = None
@@ -715,36 +1973,59 @@ def init_session_state():
     
     if 'final_summary' not in st.session_state:
         st.session_state.final_summary = None
+
+
+@st.cache_resource
+def get_agent_graph():
+    """
+    Return the compiled LangGraph workflow, built once per process on first use.
+    Nodes read the registry from session state at call time, so sessions can share it.
+    """
+    return create_agent_graph()
+
+
+@st.cache_data(show_spinner=False)
+def _api_table(context_hash: str, _registry: ApiRegistry) -> Dict[str, List[str]]:
+    """
+    Column-oriented view of the registry for the sidebar table.
     
-    if 'agent_graph' not in st.session_state:
-        st.session_state.agent_graph = create_agent_graph()
+    Keyed on the registry's content hash, so the table is only rebuilt after
+    the registry changes rather than row by row on every rerun.
+    """
+    apis = _registry.list_apis()
+    return {
+        "Name": [api.name for api in apis],
+        "Method": [api.method for api in apis],
+        "Domain": [api.domain for api in apis],
+        "URL": [api.url[:50] + "..." if len(api.url) > 50 else api.url for api in apis],
+    }
 
 
+@st.fragment
 def render_api_registry_sidebar():
-    """Render the API registry management sidebar."""
-    st.sidebar.title("API Registry Management")
+    """
+    Render the API registry management sidebar.
+    
+    Runs as a fragment inside `with st.sidebar:` (fragments may not write to
+    st.sidebar directly), so registry widgets rerun only this function.
+    Changes other parts of the page depend on trigger a full app rerun.
+    """
+    st.title("API Registry Management")
     
     # Display current APIs
-    st.sidebar.subheader("Registered APIs")
+    st.subheader("Registered APIs")
     apis = st.session_state.registry.list_apis()
     
     if apis:
-        api_data = []
-        for api in apis:
-            api_data.append({
-                "Name": api.name,
-                "Method": api.method,
-                "Domain": api.domain,
-                "URL": api.url[:50] + "..." if len(api.url) > 50 else api.url
-            })
-        st.sidebar.dataframe(api_data, use_container_width=True)
+        registry = st.session_state.registry
+        st.dataframe(_api_table(registry.context_hash, registry), use_container_width=True)
     else:
-        st.sidebar.info("No APIs registered yet.")
+        st.info("No APIs registered yet.")
     
     # Add new API form
-    st.sidebar.subheader("Add New API")
+    st.subheader("Add New API")
     
-    with st.sidebar.form("add_api_form"):
+    with st.form("add_api_form"):
         api_name = st.text_input("API Name*", help="Unique identifier for the API")
         api_description = st.text_area("Description*", help="What does this API do?")
         api_url = st.text_input("URL*", help="Full endpoint URL")
@@ -755,14 +2036,14 @@ def render_api_registry_sidebar():
         st.write("**Input Schema** (JSON format)")
         api_input_schema = st.text_area(
             "Input Schema",
-            value='{\n  "param_name": {\n    "type": "string",\n    "required": true,\n    "description": "Parameter description"\n  }\n}',
+            value=DEFAULT_INPUT_SCHEMA_TEXT,
             height=150
         )
         
         st.write("**Output Schema** (JSON format)")
         api_output_schema = st.text_area(
             "Output Schema",
-            value='{\n  "field_name": {\n    "type": "string",\n    "description": "Field description"\n  }\n}',
+            value=DEFAULT_OUTPUT_SCHEMA_TEXT,
             height=150
         )
         
@@ -770,12 +2051,12 @@ def render_api_registry_sidebar():
         
         if submit_button:
             if not api_name or not api_description or not api_url:
-                st.sidebar.error("Please fill in all required fields (marked with *).")
+                st.error("Please fill in all required fields (marked with *).")
             else:
                 try:
                     # Parse JSON schemas
-                    input_schema = json.loads(api_input_schema)
-                    output_schema = json.loads(api_output_schema)
+                    input_schema = orjson.loads(api_input_schema)
+                    output_schema = orjson.loads(api_output_schema)
                     
                     # Create API definition
                     new_api = ApiDefinition(
@@ -791,30 +2072,32 @@ def render_api_registry_sidebar():
                     
                     # Add to registry
                     st.session_state.registry.add_api(new_api)
-                    st.session_state.registry.save_to_json(REGISTRY_FILE_PATH)
+                    schedule_registry_save(st.session_state.registry, REGISTRY_FILE_PATH)
                     
-                    st.sidebar.success(f"API '{api_name}' added successfully!")
-                    st.rerun()
+                    st.success(f"API '{api_name}' added successfully!")
+                    st.rerun(scope="app")
                     
                 except json.JSONDecodeError as e:
-                    st.sidebar.error(f"Invalid JSON in schema: {str(e)}")
+                    st.error(f"Invalid JSON in schema: {str(e)}")
                 except Exception as e:
-                    st.sidebar.error(f"Error adding API: {str(e)}")
+                    st.error(f"Error adding API: {str(e)}")
     
     # Save/Load registry
-    st.sidebar.subheader("Registry Persistence")
-    col1, col2 = st.sidebar.columns(2)
+    st.subheader("Registry Persistence")
+    col1, col2 = st.columns(2)
     
     with col1:
         if st.button("Save Registry", use_container_width=True):
             st.session_state.registry.save_to_json(REGISTRY_FILE_PATH)
-            st.sidebar.success("Registry saved!")
+            st.success("Registry saved!")
     
     with col2:
         if st.button("Reload Registry", use_container_width=True):
+            # Let a debounced save land first so the reload doesn't read a stale file
+            flush_registry_saves()
             st.session_state.registry.load_from_json(REGISTRY_FILE_PATH)
-            st.sidebar.success("Registry reloaded!")
-            st.rerun()
+            st.success("Registry reloaded!")
+            st.rerun(scope="app")
 
 
 def render_main_interface():
@@ -846,7 +2129,8 @@ def render_main_interface():
     # Generate plan
     if generate_plan_button and user_query:
         with st.spinner("Planning API calls..."):
-            # Create initial state
+            # Create initial state (to_llm_context is memoized on the registry version,
+            # so the registry is only re-serialized after an add/remove/load)
             initial_state = {
                 "user_query": user_query,
                 "api_registry_context": st.session_state.registry.to_llm_context(),
@@ -857,10 +2141,20 @@ def render_main_interface():
                 "error": None
             }
             
-            # Run only the planning node
-            result_state = planning_node(initial_state)
+            # With no plan yet the graph stops after planning, so the user can review it;
+            # in fused mode it has already called read-only APIs and answered
+            result_state = get_agent_graph().invoke(initial_state)
             
-            if result_state.get("error"):
+            if result_state.get("execution_results") or result_state.get("final_summary"):
+                st.session_state.current_plan = result_state["plan"] or None
+                st.session_state.current_plan_reasoning = "Planned and answered in one tool-calling conversation."
+                st.session_state.execution_results = result_state["execution_results"]
+                st.session_state.final_summary = result_state["final_summary"]
+                if result_state.get("error"):
+                    st.warning(result_state["error"])
+                else:
+                    st.success("✅ Answered using read-only APIs!")
+            elif result_state.get("error"):
                 st.error(f"Planning Error: {result_state['error']}")
                 st.text("Raw LLM Response:")
                 st.code(result_state.get("plan_reasoning", ""), language="text")
@@ -883,21 +2177,28 @@ def render_main_interface():
             st.markdown("**Overall Reasoning:**")
             st.info(st.session_state.current_plan_reasoning)
         
-        # Display plan steps
-        for step in st.session_state.current_plan:
-            with st.expander(f"Step {step.get('step', '?')}: {step.get('api_name', 'Unknown API')}", expanded=True):
-                st.markdown(f"**API:** `{step.get('api_name', 'N/A')}`")
-                
-                if show_reasoning:
-                    st.markdown(f"**Rationale:** {step.get('rationale', 'N/A')}")
-                
-                st.markdown("**Inputs:**")
-                st.json(step.get('inputs', {}))
-                
-                st.markdown(f"**Expected Outputs:** {step.get('expected_outputs', 'N/A')}")
-                
-                if show_reasoning:
-                    st.markdown(f"**Output Usage:** {step.get('output_usage', 'N/A')}")
+        # One table for the whole plan; full details only for the inspected step
+        plan = st.session_state.current_plan
+        plan_table = {
+            "Step": [step.get('step', '?') for step in plan],
+            "API": [step.get('api_name', 'Unknown API') for step in plan],
+            "Expected Outputs": [step.get('expected_outputs', 'N/A') for step in plan],
+        }
+        if show_reasoning:
+            plan_table["Rationale"] = [step.get('rationale', 'N/A') for step in plan]
+        st.dataframe(plan_table, use_container_width=True, hide_index=True)
+        
+        step_index = st.selectbox(
+            "Inspect step",
+            range(len(plan)),
+            format_func=lambda i: f"Step {plan[i].get('step', '?')}: {plan[i].get('api_name', 'Unknown API')}",
+        )
+        step = plan[step_index]
+        st.markdown("**Inputs:**")
+        st.json(step.get('inputs', {}))
+        
+        if show_reasoning:
+            st.markdown(f"**Output Usage:** {step.get('output_usage', 'N/A')}")
     
     # Execute plan
     if execute_button and st.session_state.current_plan:
@@ -913,57 +2214,74 @@ def render_main_interface():
                 "error": None
             }
             
-            # Run execution and summarization
-            execution_state = execution_node(execution_state)
-            execution_state = summarization_node(execution_state)
+            # A confirmed plan enters the graph at execution, then summarizes unless skipped
+            execution_state = get_agent_graph().invoke(execution_state)
             
             st.session_state.execution_results = execution_state["execution_results"]
             st.session_state.final_summary = execution_state["final_summary"]
             
             st.success("✅ Execution completed!")
     
-    # Display results
-    if st.session_state.execution_results:
-        st.markdown("---")
-        st.subheader("📊 Execution Results")
-        
-        # Display AI-generated summary first
-        st.markdown("### 🎯 Summary")
-        st.markdown(st.session_state.final_summary)
-        
-        # Display raw results
-        st.markdown("### 🔍 Detailed Results")
-        
-        for result in st.session_state.execution_results:
-            step_num = result.get('step', '?')
-            api_name = result.get('api_name', 'Unknown')
-            success = result.get('success', False)
-            
-            status_icon = "✅" if success else "❌"
-            
-            with st.expander(f"{status_icon} Step {step_num}: {api_name}", expanded=not success):
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    st.markdown(f"**Method:** `{result.get('api_method', 'N/A')}`")
-                    st.markdown(f"**URL:** `{result.get('api_url', 'N/A')}`")
-                
-                with col2:
-                    st.markdown(f"**Status:** {'Success' if success else 'Failed'}")
-                    if 'status_code' in result:
-                        st.markdown(f"**Status Code:** `{result['status_code']}`")
-                
-                st.markdown("**Inputs:**")
-                st.json(result.get('inputs', {}))
-                
-                if success:
-                    st.markdown("**Response:**")
-                    st.json(result.get('data', {}))
-                else:
-                    st.error(f"**Error:** {result.get('error', 'Unknown error')}")
-                    if 'traceback' in result:
-                        with st.expander("View Traceback"):
-                            st.code(result['traceback'], language="python")
+    # Display results (a fused answer may need no API calls at all)
+    if st.session_state.execution_results or st.session_state.final_summary:
+        render_execution_results()
+
+
+@st.fragment
+def render_execution_results():
+    """Render the summary and per-step results of the last execution."""
+    st.markdown("---")
+    st.subheader("📊 Execution Results")
+    
+    # Display AI-generated summary first
+    st.markdown("### 🎯 Summary")
+    st.markdown(st.session_state.final_summary)
+    
+    results = st.session_state.execution_results
+    if not results:
+        return
+    
+    # Display raw results
+    st.markdown("### 🔍 Detailed Results")
+    
+    # One table for every step; full details only for the inspected result
+    st.dataframe(
+        {
+            "Step": [result.step for result in results],
+            "API": [result.api_name for result in results],
+            "Method": [result.api_method or "N/A" for result in results],
+            "Status": ["✅ Success" if result.success else "❌ Failed" for result in results],
+            "Status Code": [result.status_code for result in results],
+            "Error": [result.error or "" for result in results],
+        },
+        use_container_width=True,
+        hide_index=True,
+    )
+    
+    # Open on the first failure, if any, like the failed expanders used to
+    first_failure = next((i for i, result in enumerate(results) if not result.success), 0)
+    result_index = st.selectbox(
+        "Inspect result",
+        range(len(results)),
+        index=first_failure,
+        format_func=lambda i: f"{'✅' if results[i].success else '❌'} Step {results[i].step}: {results[i].api_name}",
+    )
+    result = results[result_index]
+    
+    st.markdown(f"**URL:** `{result.api_url or 'N/A'}`")
+    st.markdown("**Inputs:**")
+    st.json(result.inputs)
+    
+    if result.success:
+        st.markdown("**Response:**")
+        st.json(_plain(result.data))
+    else:
+        st.error(f"**Error:** {result.error or 'Unknown error'}")
+        if result.body:
+            st.code(result.body, language="text")
+        if result.exc_info:
+            with st.expander("View Traceback"):
+                st.code(get_traceback(result), language="python")
 
 
 def main():
@@ -979,7 +2297,8 @@ def main():
     init_session_state()
     
     # Render UI components
-    render_api_registry_sidebar()
+    with st.sidebar:
+        render_api_registry_sidebar()
     render_main_interface()
     
     # Footer
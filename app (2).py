@@ -2,12 +2,64 @@
 import streamlit as st
 import json
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
 from datetime import datetime
-from typing import Dict, List, Any, Generator
+from typing import Dict, List, Any, Generator, Optional, TypedDict, Union
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import os
+import functools
+import hashlib
+import re
+import threading
+from collections import OrderedDict
 from urllib.parse import urlencode
-import pandas as pd
+
+# orjson parses and pretty-prints JSON faster; its JSONDecodeError subclasses json's, so except clauses are unchanged
+try:
+    import orjson
+    _loads = orjson.loads
+
+    def _dumps_pretty(obj: Any, sort_keys: bool = False) -> str:
+        """Indented JSON text (2 spaces)"""
+        option = orjson.OPT_INDENT_2 | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        return orjson.dumps(obj, option=option).decode()
+except ImportError:
+    _loads = json.loads
+
+    def _dumps_pretty(obj: Any, sort_keys: bool = False) -> str:
+        """Indented JSON text (2 spaces)"""
+        return json.dumps(obj, indent=2, sort_keys=sort_keys)
+
+class ServiceCall(TypedDict, total=False):
+    """One entry of a plan's services_to_call"""
+    service_key: Optional[str]
+    service_name: Optional[str]
+    url: Optional[str]
+    http_method: Optional[str]
+    parameters: Optional[Dict[str, Any]]
+    order: Union[int, str, None]  # Only displayed, so a label like "first" is fine too
+    depends_on: Union[str, List[str], None]  # plan_waves also accepts a list of keys
+
+class PlanResponse(TypedDict, total=False):
+    """The JSON plan the LLM is asked to return"""
+    plan: Optional[str]
+    reasoning: Optional[str]
+    services_to_call: Optional[List[ServiceCall]]
+
+# With msgspec the plan is decoded and type-checked against its declared shape in one pass.
+# TypedDicts decode to plain dicts, so code reading the plan is the same either way.
+# Every field also accepts null, so the check is never stricter than plain json.loads was
+# on plans the app could use; strict=False accepts the LLM's occasional "order": "1".
+try:
+    import msgspec
+    _decode_plan = msgspec.json.Decoder(PlanResponse, strict=False).decode
+    _decode_service_call = msgspec.json.Decoder(ServiceCall, strict=False).decode
+    PlanDecodeError = (json.JSONDecodeError, msgspec.DecodeError)
+except ImportError:
+    _decode_plan = _decode_service_call = _loads
+    PlanDecodeError = json.JSONDecodeError
 
 # Page configuration
 st.set_page_config(
@@ -64,7 +116,92 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+# Plan streaming: redraw the plan at most this often, or after this many new characters
+PLAN_RENDER_INTERVAL = 0.2
+PLAN_RENDER_BYTES = 1024
+MAX_PARALLEL_CALLS = 8  # Concurrent service calls (prefetches and wave calls share this pool)
+# Keep-alive pool of the shared HTTP session: hosts tracked, and connections kept per host.
+# Per-host size must cover MAX_PARALLEL_CALLS, or concurrent calls to one host open
+# connections that are discarded instead of reused.
+HTTP_POOL_HOSTS = 32
+HTTP_POOL_SIZE = max(64, MAX_PARALLEL_CALLS)
+# Transient failures (connect errors, 502/503/504) are retried with exponential backoff.
+# POST is never retried since it isn't idempotent.
+HTTP_RETRIES = 2  # Retries after the first attempt
+HTTP_RETRY_BACKOFF = 0.2  # Seconds; doubles per retry
+HTTP_RETRY_JITTER = 0.1  # Max random seconds added to each backoff (urllib3 2.x)
+PLAN_CACHE_TTL = 3600  # Seconds a plan is reused for the same prompt, services and model
+PLAN_CACHE_SIZE = 256  # Most recent plans kept
+PLAN_BATCH_WORKERS = 8  # Concurrent LLM calls in Batch Mode
+# Supported HTTP methods -> whether the call sends its data as a JSON body
+HTTP_METHOD_SENDS_BODY = {"GET": False, "POST": True, "PUT": True, "DELETE": False}
+
 # ==================== VENDOR-AGNOSTIC LLM CLIENT ====================
+# SDKs are imported on first use and only once per process
+@functools.lru_cache(maxsize=None)
+def _anthropic():
+    try:
+        import anthropic
+    except ImportError:
+        raise ImportError("anthropic package not installed. Install with: pip install anthropic")
+    return anthropic
+
+@functools.lru_cache(maxsize=None)
+def _openai():
+    try:
+        import openai
+    except ImportError:
+        raise ImportError("openai package not installed. Install with: pip install openai")
+    return openai
+
+# Planning system prompt. The fixed instructions come first and the services catalog last,
+# so everything before the user's message is a stable prefix for provider prompt caching.
+_SYSTEM_INSTRUCTIONS = """You are an API orchestration expert. Based on the user's request and available services, you must:
+1. Identify which service(s) need to be called
+2. Determine the order of execution (if multiple services)
+3. Construct the exact URL(s) that would work in Postman
+4. Provide the parameters needed
+
+Respond in JSON format with:
+{
+    "plan": "Step-by-step explanation of what will be executed",
+    "services_to_call": [
+        {
+            "service_key": "service_name",
+            "service_name": "Display name",
+            "url": "Full URL with parameters",
+            "http_method": "GET/POST/PUT/DELETE",
+            "parameters": {},
+            "order": 1,
+            "depends_on": null or "previous_service_key"
+        }
+    ],
+    "reasoning": "Why these services were chosen"
+}"""
+
+_PROMPT_CACHE_CONTROL = {"type": "ephemeral"}  # Anthropic prompt caching breakpoint
+
+def _services_block(services_info: str) -> str:
+    """The catalog section of the system prompt"""
+    return f"Available Services:\n{services_info}"
+
+@functools.lru_cache(maxsize=4)
+def _build_prompt(services_info: str) -> str:
+    """System prompt as one string (OpenAI-compatible providers) for a services snapshot"""
+    return f"{_SYSTEM_INSTRUCTIONS}\n\n{_services_block(services_info)}"
+
+@functools.lru_cache(maxsize=4)
+def _build_system_blocks(services_info: str) -> tuple:
+    """
+    Anthropic system blocks for a services snapshot: instructions, then the catalog.
+    The breakpoint on the catalog block caches the whole system prefix; the instructions
+    alone are below the minimum cacheable length, so they carry no breakpoint of their own.
+    """
+    return (
+        {"type": "text", "text": _SYSTEM_INSTRUCTIONS},
+        {"type": "text", "text": _services_block(services_info), "cache_control": _PROMPT_CACHE_CONTROL},
+    )
+
 class LLMClient:
     """
     Vendor-agnostic LLM client that supports multiple providers.
@@ -97,35 +234,23 @@ class LLMClient:
     def _initialize_client(self):
         """Initialize the appropriate client based on provider"""
         if self.provider == "anthropic":
-            try:
-                import anthropic
-                self.client = anthropic.Anthropic(api_key=self.api_key)
-            except ImportError:
-                raise ImportError("anthropic package not installed. Install with: pip install anthropic")
+            self.client = _anthropic().Anthropic(api_key=self.api_key)
 
         elif self.provider == "openai":
-            try:
-                import openai
-                self.client = openai.OpenAI(api_key=self.api_key, base_url=self.base_url)
-            except ImportError:
-                raise ImportError("openai package not installed. Install with: pip install openai")
+            self.client = _openai().OpenAI(api_key=self.api_key, base_url=self.base_url)
 
         elif self.provider == "custom":
             # For custom/self-hosted providers using OpenAI-compatible API
-            try:
-                import openai
-                if not self.base_url:
-                    raise ValueError("base_url required for custom provider")
-                self.client = openai.OpenAI(api_key=self.api_key, base_url=self.base_url)
-            except ImportError:
-                raise ImportError("openai package not installed. Install with: pip install openai")
+            if not self.base_url:
+                raise ValueError("base_url required for custom provider")
+            self.client = _openai().OpenAI(api_key=self.api_key, base_url=self.base_url)
 
         else:
             raise ValueError(f"Unsupported provider: {self.provider}")
 
     def plan(self, user_prompt: str, services_info: str) -> str:
         """
-        Get planning response from LLM (non-streaming)
+        Get planning response from LLM (the drained streaming response)
 
         Args:
             user_prompt: User's request
@@ -134,53 +259,7 @@ class LLMClient:
         Returns:
             LLM response as string
         """
-        system_prompt = f"""You are an API orchestration expert. Based on the user's request and available services, you must:
-1. Identify which service(s) need to be called
-2. Determine the order of execution (if multiple services)
-3. Construct the exact URL(s) that would work in Postman
-4. Provide the parameters needed
-
-Available Services:
-{services_info}
-
-Respond in JSON format with:
-{{
-    "plan": "Step-by-step explanation of what will be executed",
-    "services_to_call": [
-        {{
-            "service_key": "service_name",
-            "service_name": "Display name",
-            "url": "Full URL with parameters",
-            "http_method": "GET/POST/PUT/DELETE",
-            "parameters": {{}},
-            "order": 1,
-            "depends_on": null or "previous_service_key"
-        }}
-    ],
-    "reasoning": "Why these services were chosen"
-}}"""
-
-        if self.provider == "anthropic":
-            message = self.client.messages.create(
-                model=self.model,
-                max_tokens=2000,
-                system=system_prompt,
-                messages=[
-                    {"role": "user", "content": user_prompt}
-                ]
-            )
-            return message.content[0].text
-
-        elif self.provider in ["openai", "custom"]:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                max_tokens=2000,
-                system=system_prompt,
-                messages=[
-                    {"role": "user", "content": user_prompt}
-                ]
-            )
-            return response.choices[0].message.content
+        return "".join(self.plan_streaming(user_prompt, services_info))
 
     def plan_streaming(self, user_prompt: str, services_info: str) -> Generator[str, None, None]:
         """
@@ -193,37 +272,13 @@ Respond in JSON format with:
         Yields:
             Streamed text chunks
         """
-        system_prompt = f"""You are an API orchestration expert. Based on the user's request and available services, you must:
-1. Identify which service(s) need to be called
-2. Determine the order of execution (if multiple services)
-3. Construct the exact URL(s) that would work in Postman
-4. Provide the parameters needed
-
-Available Services:
-{services_info}
-
-Respond in JSON format with:
-{{
-    "plan": "Step-by-step explanation of what will be executed",
-    "services_to_call": [
-        {{
-            "service_key": "service_name",
-            "service_name": "Display name",
-            "url": "Full URL with parameters",
-            "http_method": "GET/POST/PUT/DELETE",
-            "parameters": {{}},
-            "order": 1,
-            "depends_on": null or "previous_service_key"
-        }}
-    ],
-    "reasoning": "Why these services were chosen"
-}}"""
-
         if self.provider == "anthropic":
             with self.client.messages.stream(
                 model=self.model,
                 max_tokens=2000,
-                system=system_prompt,
+                # Byte-identical for a services snapshot, so later plans over the same
+                # services reuse the cached prefix
+                system=list(_build_system_blocks(services_info)),
                 messages=[
                     {"role": "user", "content": user_prompt}
                 ]
@@ -232,17 +287,19 @@ Respond in JSON format with:
                     yield text
 
         elif self.provider in ["openai", "custom"]:
+            # OpenAI-compatible APIs take the system prompt as the first message; keeping that
+            # stable prefix first is what lets the provider's automatic prompt caching match it
             response = self.client.chat.completions.create(
                 model=self.model,
                 max_tokens=2000,
-                system=system_prompt,
                 messages=[
+                    {"role": "system", "content": _build_prompt(services_info)},
                     {"role": "user", "content": user_prompt}
                 ],
                 stream=True
             )
             for chunk in response:
-                if chunk.choices[0].delta.content:
+                if chunk.choices and chunk.choices[0].delta.content:
                     yield chunk.choices[0].delta.content
 
 # Initialize session state
@@ -252,23 +309,49 @@ if "execution_mode" not in st.session_state:
     st.session_state.execution_mode = "quick"
 if "plan_result" not in st.session_state:
     st.session_state.plan_result = None
+if "plan_params_json" not in st.session_state:
+    st.session_state.plan_params_json = []  # Pretty-printed parameters of each planned call, in plan order
 if "execution_result" not in st.session_state:
     st.session_state.execution_result = None
 if "quick_mode_result" not in st.session_state:
     st.session_state.quick_mode_result = None
+if "batch_result" not in st.session_state:
+    st.session_state.batch_result = None  # [(prompt, plan or None)] from the last Batch Mode run
 if "llm_client" not in st.session_state:
     st.session_state.llm_client = None
+if "services_version" not in st.session_state:
+    st.session_state.services_version = 0  # Bumped on every change to services
+if "services_info_cache" not in st.session_state:
+    st.session_state.services_info_cache = None  # (services_version, services JSON)
 
 # Initialize LLM Client
-@st.cache_resource
+@st.cache_resource(show_spinner=False)
+def _cached_llm_client(provider: str, api_key_hash: str, model: str, base_url: str, _api_key: str) -> LLMClient:
+    """One client per (provider, key, model, base_url); keyed on a hash so the key is never stored as a cache key"""
+    return LLMClient(provider=provider, api_key=_api_key, model=model, base_url=base_url)
+
 def get_llm_client(provider: str, api_key: str, model: str, base_url: str = None):
     """Get or create LLM client"""
+    api_key_hash = hashlib.sha256(api_key.encode()).hexdigest()
     try:
-        return LLMClient(provider=provider, api_key=api_key, model=model, base_url=base_url)
+        return _cached_llm_client(provider, api_key_hash, model, base_url, api_key)
     except Exception as e:
+        # Failures raise out of the cached function, so they are not cached and a retry can succeed
         st.error(f"Failed to initialize LLM client: {str(e)}")
         return None
 
+def get_services_info() -> str:
+    """
+    Services JSON for the planning prompt, re-serialized only after the services change.
+    Keys are sorted so the same services always give byte-identical text (a stable prompt prefix).
+    """
+    cached = st.session_state.services_info_cache
+    if cached is None or cached[0] != st.session_state.services_version:
+        cached = (st.session_state.services_version,
+                  _dumps_pretty(st.session_state.services, sort_keys=True))
+        st.session_state.services_info_cache = cached
+    return cached[1]
+
 # ==================== SAMPLE SERVICES ====================
 def initialize_sample_services():
     """Initialize sample services for testing"""
@@ -328,19 +411,41 @@ def construct_url(base_url: str, params: Dict[str, Any], http_method: str) -> st
         return f"{base_url}?{query_string}"
     return base_url
 
+def _retry_policy() -> Retry:
+    """Backoff-and-retry policy for transient failures of idempotent calls"""
+    options = dict(
+        total=HTTP_RETRIES,
+        read=False,  # The request may already have been processed
+        backoff_factor=HTTP_RETRY_BACKOFF,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET", "PUT", "DELETE"}),
+        raise_on_status=False,  # The last response is returned and raise_for_status reports it
+    )
+    try:
+        return Retry(backoff_jitter=HTTP_RETRY_JITTER, **options)
+    except TypeError:
+        # urllib3 1.x has no jitter option
+        return Retry(**options)
+
+@st.cache_resource
+def get_http_session() -> requests.Session:
+    """Shared pooled session so repeated calls to the same host reuse TCP/TLS connections"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_HOSTS, pool_maxsize=HTTP_POOL_SIZE,
+                          max_retries=_retry_policy())
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
 def execute_api_call(url: str, http_method: str, data: Dict = None) -> Dict[str, Any]:
     """Execute API call"""
     try:
-        if http_method.upper() == "GET":
-            response = requests.get(url, timeout=10)
-        elif http_method.upper() == "POST":
-            response = requests.post(url, json=data, timeout=10)
-        elif http_method.upper() == "PUT":
-            response = requests.put(url, json=data, timeout=10)
-        elif http_method.upper() == "DELETE":
-            response = requests.delete(url, timeout=10)
-        else:
+        # Planned methods are normally upper-case already, so skip the copy when they are
+        method = http_method if http_method.isupper() else http_method.upper()
+        sends_body = HTTP_METHOD_SENDS_BODY.get(method)
+        if sends_body is None:
             return {"error": f"Unsupported HTTP method: {http_method}"}
+        response = get_http_session().request(method, url, json=data if sends_body else None, timeout=10)
 
         response.raise_for_status()
         return {
@@ -354,6 +459,312 @@ def execute_api_call(url: str, http_method: str, data: Dict = None) -> Dict[str,
             "success": False
         }
 
+def plan_waves(services_to_call: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """
+    Group planned service calls into waves by depends_on: wave 0 has no dependencies
+    inside the plan, and wave k only depends on services from earlier waves.
+    Calls caught in a dependency cycle run together in a final wave.
+    """
+    planned_keys = {service_call.get('service_key') for service_call in services_to_call}
+
+    def dependencies(service_call: Dict[str, Any]) -> set:
+        depends_on = service_call.get('depends_on')
+        if not depends_on:
+            return set()
+        names = depends_on if isinstance(depends_on, list) else [depends_on]
+        return {name for name in names if name in planned_keys}
+
+    waves = []
+    done = set()
+    remaining = list(services_to_call)
+    while remaining:
+        wave = [service_call for service_call in remaining if dependencies(service_call) <= done]
+        if not wave:
+            wave = remaining
+        waves.append(wave)
+        done.update(service_call.get('service_key') for service_call in wave)
+        remaining = [service_call for service_call in remaining if service_call not in wave]
+    return waves
+
+@st.cache_resource
+def get_call_pool() -> ThreadPoolExecutor:
+    """Shared worker pool for service calls; bounds fan-out without starting threads per wave"""
+    return ThreadPoolExecutor(max_workers=MAX_PARALLEL_CALLS, thread_name_prefix="service-call")
+
+def execute_wave(wave: List[Dict[str, Any]], prefetched: Dict = None, on_result=None) -> List[Dict[str, Any]]:
+    """
+    Execute one wave of independent service calls concurrently; results follow wave order.
+    A call that raises is reported as a failed result, so one bad call can't abort its wave.
+    on_result, if given, is called with (service_call, result) on the calling thread as
+    each call finishes, so the UI can show results before the whole wave is done.
+    """
+    prefetched = prefetched or {}
+    pool = get_call_pool()
+    results = [None] * len(wave)
+    futures = {}
+    for index, service_call in enumerate(wave):
+        key = (service_call.get('url'), service_call.get('http_method', 'GET'))
+        future = prefetched.get(key) or pool.submit(execute_api_call, *key)
+        # Identical calls share one prefetched future, so a future can serve several indices
+        futures.setdefault(future, []).append(index)
+    for future in as_completed(futures):
+        try:
+            result = future.result()
+        except Exception as e:
+            result = {"error": f"{type(e).__name__}: {e}", "success": False}
+        for index in futures[future]:
+            results[index] = result
+            if on_result:
+                on_result(wave[index], result)
+    return results
+
+def execute_plan(services_to_call: List[Dict[str, Any]], prefetched: Dict = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Execute a plan wave by wave, reporting each service and advancing a progress bar
+    as soon as its call finishes. Returns the results keyed by service_key, in plan order.
+    """
+    if not services_to_call:
+        return {}
+    total = len(services_to_call)
+    progress = st.progress(0.0, text=f"0/{total} services done")
+    call_results = {}
+
+    def report(service_call: Dict[str, Any], result: Dict[str, Any]):
+        call_results[id(service_call)] = result
+        if result.get('success'):
+            st.success(f"✅ {service_call.get('service_name')} completed")
+        else:
+            st.error(f"❌ {service_call.get('service_name')} failed: {result.get('error')}")
+        progress.progress(len(call_results) / total, text=f"{len(call_results)}/{total} services done")
+
+    for wave in plan_waves(services_to_call):
+        st.write(f"🔄 Executing: {', '.join(str(service_call.get('service_name')) for service_call in wave)}")
+        execute_wave(wave, prefetched, on_result=report)
+
+    return {
+        service_call.get('service_key'): call_results[id(service_call)] for service_call in services_to_call
+    }
+
+class ServiceCallScanner:
+    """
+    Incrementally extracts complete objects from the plan's "services_to_call" array
+    while the plan JSON is still streaming in. String literals are skipped, so braces
+    inside values don't confuse the depth tracking.
+    """
+
+    KEY = "services_to_call"
+
+    def __init__(self):
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._string = []          # Current string literal (only short ones matter for key matching)
+        self._last_string = None   # Most recent complete string, a key candidate
+        self._key = None           # Key whose ':' has been seen
+        self._array_depth = None   # Depth inside the services_to_call array
+        self._done = False
+        self._object = None        # Pieces of the service object being captured
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Consume a chunk; return any service call objects completed by it"""
+        completed = []
+        if self._done:
+            return completed
+        start = 0 if self._object is not None else None
+
+        for i, ch in enumerate(chunk):
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                    self._last_string = "".join(self._string)
+                elif len(self._string) <= len(self.KEY):
+                    self._string.append(ch)
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._string = []
+            elif ch == ":":
+                self._key = self._last_string
+            elif ch in "{[":
+                if ch == "[" and self._array_depth is None and self._key == self.KEY:
+                    self._array_depth = self._depth + 1
+                elif ch == "{" and self._depth == self._array_depth:
+                    self._object = []
+                    start = i
+                self._depth += 1
+                self._key = None
+            elif ch in "}]":
+                self._depth -= 1
+                if self._object is not None and self._depth == self._array_depth:
+                    self._object.append(chunk[start:i + 1])
+                    try:
+                        completed.append(_decode_service_call("".join(self._object)))
+                    except PlanDecodeError:
+                        pass
+                    self._object = None
+                    start = None
+                elif self._array_depth is not None and self._depth < self._array_depth:
+                    self._done = True
+                    break
+            elif ch == ",":
+                self._key = None
+
+        if self._object is not None and start is not None:
+            self._object.append(chunk[start:])
+        return completed
+
+_WHITESPACE_RUN = re.compile(r"\s+")
+_CSV_SPLIT = re.compile(r"\s*,\s*")  # Comma-separated field values, with surrounding spaces
+
+class PlanCache:
+    """Thread-safe LRU of finished plan responses with a TTL, shared by every session"""
+
+    def __init__(self, ttl: float = PLAN_CACHE_TTL, max_entries: int = PLAN_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (stored_at, response)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize_prompt(user_prompt: str) -> str:
+        """
+        Fold away differences that can't change the plan: surrounding/repeated whitespace
+        and trailing sentence punctuation. Case and inner punctuation are kept, since
+        IDs and names in the prompt end up in URLs.
+        """
+        return _WHITESPACE_RUN.sub(" ", user_prompt).strip().rstrip(".!?").rstrip()
+
+    @staticmethod
+    def key(llm_client: LLMClient, user_prompt: str, services_info: str) -> str:
+        """Deterministic key for a plan request; parts are NUL-separated so they can't run together"""
+        digest = hashlib.sha256()
+        prompt = PlanCache.normalize_prompt(user_prompt)
+        for part in (llm_client.provider, llm_client.model or "", services_info, prompt):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached response for key, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: str, response: str):
+        """Store a response, evicting the least recently used entries past max_entries"""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def put_plan(self, key: str, response: str) -> Optional[Dict[str, Any]]:
+        """Store a response only if it decodes to a plan object; returns the decoded plan or None"""
+        try:
+            plan = _decode_plan(response)
+        except PlanDecodeError:
+            return None
+        if not isinstance(plan, dict):
+            return None
+        self.put(key, response)
+        return plan
+
+    def clear(self):
+        """Drop every cached plan"""
+        with self._lock:
+            self._entries.clear()
+
+@st.cache_resource
+def get_plan_cache() -> PlanCache:
+    """Process-wide plan cache"""
+    return PlanCache()
+
+def stream_plan(llm_client: LLMClient, user_prompt: str, services_info: str, placeholder, on_service_call=None) -> str:
+    """
+    Stream the plan into a placeholder and return the full response text.
+
+    The placeholder is redrawn at most every PLAN_RENDER_INTERVAL seconds or
+    PLAN_RENDER_BYTES characters instead of per token. on_service_call, if given,
+    is called with each services_to_call entry as soon as it is complete.
+
+    Identical requests (same prompt, services and model) are answered from the
+    plan cache without calling the LLM; only responses that parse are cached.
+    """
+    plan_cache = get_plan_cache()
+    cache_key = PlanCache.key(llm_client, user_prompt, services_info)
+    cached = plan_cache.get(cache_key)
+    if cached is not None:
+        if on_service_call:
+            for service_call in _decode_plan(cached).get('services_to_call') or []:
+                on_service_call(service_call)
+        placeholder.markdown(f"```json\n{cached}\n```")
+        return cached
+
+    chunks = []
+    scanner = ServiceCallScanner() if on_service_call else None
+    last_flush = time.monotonic()
+    pending = 0
+
+    for chunk in llm_client.plan_streaming(user_prompt, services_info):
+        chunks.append(chunk)
+        pending += len(chunk)
+        if scanner:
+            for service_call in scanner.feed(chunk):
+                on_service_call(service_call)
+
+        now = time.monotonic()
+        if now - last_flush >= PLAN_RENDER_INTERVAL or pending >= PLAN_RENDER_BYTES:
+            # Keep the joined text as the only chunk, so later joins start from one piece
+            chunks = ["".join(chunks)]
+            placeholder.markdown(f"```json\n{chunks[0]}\n```")
+            last_flush = now
+            pending = 0
+
+    full_response = "".join(chunks)
+    if pending:
+        placeholder.markdown(f"```json\n{full_response}\n```")
+    plan_cache.put_plan(cache_key, full_response)
+    return full_response
+
+def plan_batch(llm_client: LLMClient, prompts: List[str], services_info: str) -> List[Optional[Dict[str, Any]]]:
+    """
+    Plan several prompts concurrently (up to PLAN_BATCH_WORKERS LLM calls at once).
+
+    Every request shares the same system prompt, so provider prompt caching
+    covers it after the first; repeated prompts come from the plan cache.
+    Returns the decoded plans in prompt order, None where the call failed or the response didn't parse.
+    """
+    plan_cache = get_plan_cache()
+
+    def plan_one(user_prompt: str) -> Optional[Dict[str, Any]]:
+        cache_key = PlanCache.key(llm_client, user_prompt, services_info)
+        cached = plan_cache.get(cache_key)
+        if cached is not None:
+            return _decode_plan(cached)
+        try:
+            response = llm_client.plan(user_prompt, services_info)
+        except Exception:
+            # One failed request shouldn't lose the rest of the batch
+            return None
+        return plan_cache.put_plan(cache_key, response)
+
+    # A prompt repeated within the batch is planned once
+    unique_prompts = list(dict.fromkeys(prompts))
+    with ThreadPoolExecutor(max_workers=PLAN_BATCH_WORKERS, thread_name_prefix="plan-batch") as pool:
+        plans = dict(zip(unique_prompts, pool.map(plan_one, unique_prompts)))
+    return [plans[user_prompt] for user_prompt in prompts]
+
 def execute_quick_mode_agentic(user_prompt: str, services_info: str, llm_client: LLMClient):
     """Execute Quick Mode with internal agentic workflow (no user interaction)"""
 
@@ -361,14 +772,23 @@ def execute_quick_mode_agentic(user_prompt: str, services_info: str, llm_client:
     st.markdown('<div class="processing-box"><b>🤔 Step 1: Planning...</b></div>', unsafe_allow_html=True)
     plan_placeholder = st.empty()
 
-    full_plan_response = ""
-    for chunk in llm_client.plan_streaming(user_prompt, services_info):
-        full_plan_response += chunk
-        plan_placeholder.markdown(f"```json\n{full_plan_response}\n```")
+    # Independent calls start in the background on the shared call pool as soon as the plan names them
+    call_pool = get_call_pool()
+    prefetched = {}
+
+    def prefetch(service_call: Dict[str, Any]):
+        # Only side-effect-free GETs are started before the plan has been parsed and shown
+        if (not service_call.get('depends_on') and service_call.get('url')
+                and service_call.get('http_method', 'GET').upper() == 'GET'):
+            key = (service_call.get('url'), service_call.get('http_method', 'GET'))
+            if key not in prefetched:
+                prefetched[key] = call_pool.submit(execute_api_call, *key)
+
+    full_plan_response = stream_plan(llm_client, user_prompt, services_info, plan_placeholder, prefetch)
 
     try:
-        plan_result = json.loads(full_plan_response)
-    except json.JSONDecodeError:
+        plan_result = _decode_plan(full_plan_response)
+    except PlanDecodeError:
         st.error("Failed to parse plan response")
         return None
 
@@ -387,22 +807,8 @@ def execute_quick_mode_agentic(user_prompt: str, services_info: str, llm_client:
     # Step 2: Execute (automatically)
     st.markdown('<div class="processing-box"><b>⚙️ Step 2: Executing Services...</b></div>', unsafe_allow_html=True)
 
-    services_to_call = plan_result.get('services_to_call', [])
-    execution_results = {}
-
-    for service_call in services_to_call:
-        service_key = service_call.get('service_key')
-        url = service_call.get('url')
-        http_method = service_call.get('http_method', 'GET')
-
-        with st.spinner(f"🔄 Executing: {service_call.get('service_name')}"):
-            result = execute_api_call(url, http_method)
-            execution_results[service_key] = result
-
-            if result.get('success'):
-                st.success(f"✅ {service_call.get('service_name')} completed")
-            else:
-                st.error(f"❌ {service_call.get('service_name')} failed: {result.get('error')}")
+    # Independent services run concurrently; each one is reported as soon as it finishes
+    execution_results = execute_plan(plan_result.get('services_to_call') or [], prefetched)
 
     st.markdown('<div class="success-box"><b>✅ All services executed!</b></div>', unsafe_allow_html=True)
 
@@ -421,6 +827,27 @@ def execute_quick_mode_agentic(user_prompt: str, services_info: str, llm_client:
         "execution_results": execution_results
     }
 
+@st.fragment
+def render_services():
+    """Registered services list; deleting one reruns only this fragment, not the whole page"""
+    if not st.session_state.services:
+        return
+    st.subheader("📋 Registered Services")
+    for key, service in st.session_state.services.items():
+        with st.expander(f"🔹 {service['service_name']}"):
+            st.write(f"**App:** {service['application_name']}")
+            st.write(f"**Description:** {service['service_description']}")
+            st.write(f"**URL:** {service['url']}")
+            st.write(f"**Method:** {service['http_method']}")
+            st.write(f"**Input Params:** {', '.join(service['input_parameters'])}")
+            st.write(f"**Output Params:** {', '.join(service['output_parameters'])}")
+
+            if st.button(f"🗑️ Delete", key=f"delete_{key}", use_container_width=True):
+                del st.session_state.services[key]
+                st.session_state.services_version += 1
+                # The main area only changes once no services are left
+                st.rerun(scope="fragment" if st.session_state.services else "app")
+
 # ==================== MAIN UI ====================
 st.markdown('<div class="main-header">🤖 Agentic API Orchestrator</div>', unsafe_allow_html=True)
 
@@ -467,6 +894,10 @@ with st.sidebar:
             else:
                 st.error("Please provide API key and model name")
 
+        if st.button("🧹 Clear Plan Cache", use_container_width=True):
+            get_plan_cache().clear()
+            st.success("Plan cache cleared")
+
     st.divider()
 
     # Service Management
@@ -475,6 +906,7 @@ with st.sidebar:
     # Load sample services
     if st.button("📥 Load Sample Services", use_container_width=True):
         st.session_state.services = initialize_sample_services()
+        st.session_state.services_version += 1
         st.success("Sample services loaded!")
         st.rerun()
 
@@ -505,10 +937,11 @@ with st.sidebar:
                     "service_description": service_desc,
                     "url": url,
                     "http_method": http_method,
-                    "input_parameters": [p.strip() for p in input_params.split(",") if p.strip()],
-                    "sample_input": json.loads(sample_input) if sample_input else {},
-                    "output_parameters": [p.strip() for p in output_params.split(",") if p.strip()]
+                    "input_parameters": [p for p in _CSV_SPLIT.split(input_params.strip()) if p],
+                    "sample_input": _loads(sample_input) if sample_input else {},
+                    "output_parameters": [p for p in _CSV_SPLIT.split(output_params.strip()) if p]
                 }
+                st.session_state.services_version += 1
                 st.success(f"Service '{service_name}' added!")
                 st.rerun()
             else:
@@ -517,20 +950,7 @@ with st.sidebar:
     st.divider()
 
     # View services
-    if st.session_state.services:
-        st.subheader("📋 Registered Services")
-        for key, service in st.session_state.services.items():
-            with st.expander(f"🔹 {service['service_name']}"):
-                st.write(f"**App:** {service['application_name']}")
-                st.write(f"**Description:** {service['service_description']}")
-                st.write(f"**URL:** {service['url']}")
-                st.write(f"**Method:** {service['http_method']}")
-                st.write(f"**Input Params:** {', '.join(service['input_parameters'])}")
-                st.write(f"**Output Params:** {', '.join(service['output_parameters'])}")
-
-                if st.button(f"🗑️ Delete", key=f"delete_{key}", use_container_width=True):
-                    del st.session_state.services[key]
-                    st.rerun()
+    render_services()
 
 # Main content area
 if not st.session_state.llm_client:
@@ -539,7 +959,7 @@ elif not st.session_state.services:
     st.info("👈 Please load or add services from the sidebar to get started!")
 else:
     # Execution mode selection
-    col1, col2 = st.columns(2)
+    col1, col2, col3 = st.columns(3)
     with col1:
         if st.button("⚡ Quick Mode (1-Step Agentic)", use_container_width=True,
                      type="primary" if st.session_state.execution_mode == "quick" else "secondary"):
@@ -552,6 +972,12 @@ else:
             st.session_state.execution_mode = "agentic"
             st.rerun()
 
+    with col3:
+        if st.button("📦 Batch Mode (Plan Many)", use_container_width=True,
+                     type="primary" if st.session_state.execution_mode == "batch" else "secondary"):
+            st.session_state.execution_mode = "batch"
+            st.rerun()
+
     st.divider()
 
     # ==================== QUICK MODE (AGENTIC - AUTOMATIC) ====================
@@ -571,13 +997,51 @@ else:
             if not user_prompt:
                 st.error("Please enter a prompt")
             else:
-                services_info = json.dumps(st.session_state.services, indent=2)
+                services_info = get_services_info()
                 st.session_state.quick_mode_result = execute_quick_mode_agentic(
                     user_prompt, 
                     services_info, 
                     st.session_state.llm_client
                 )
 
+    # ==================== BATCH MODE (PLAN ONLY) ====================
+    elif st.session_state.execution_mode == "batch":
+        st.markdown('<div class="step-header">📦 Batch Mode - Plan Many Requests</div>', unsafe_allow_html=True)
+        st.write("**Description:** Enter one request per line; all of them are planned concurrently. Nothing is executed.")
+
+        batch_prompts = st.text_area(
+            "📝 Requests (one per line):",
+            placeholder="Get user information for user ID 1\nList the posts of user 2",
+            height=150,
+            key="batch_mode_prompts"
+        )
+
+        if st.button("📦 Plan All", use_container_width=True, type="primary"):
+            prompts = [line.strip() for line in batch_prompts.splitlines() if line.strip()]
+            if not prompts:
+                st.error("Please enter at least one request")
+            else:
+                with st.spinner(f"🤔 Planning {len(prompts)} requests..."):
+                    plans = plan_batch(st.session_state.llm_client, prompts, get_services_info())
+                st.session_state.batch_result = list(zip(prompts, plans))
+
+        if st.session_state.batch_result:
+            st.dataframe(
+                {
+                    "Request": [prompt for prompt, _ in st.session_state.batch_result],
+                    "Services": [len(plan.get('services_to_call') or []) if plan else None
+                                 for _, plan in st.session_state.batch_result],
+                    "Status": ["✅ Planned" if plan else "❌ Failed"
+                               for _, plan in st.session_state.batch_result],
+                },
+                use_container_width=True,
+                hide_index=True
+            )
+            for prompt, plan in st.session_state.batch_result:
+                if plan:
+                    with st.expander(f"📋 {prompt}"):
+                        st.json(plan)
+
     # ==================== AGENTIC MODE (MANUAL 3-STEP) ====================
     else:
         st.markdown('<div class="step-header">🧠 Agentic Mode - Manual 3-Step Workflow</div>', unsafe_allow_html=True)
@@ -600,20 +1064,22 @@ else:
                     st.error("Please enter a prompt")
                 else:
                     with st.spinner("🤔 Planning with AI..."):
-                        services_info = json.dumps(st.session_state.services, indent=2)
+                        services_info = get_services_info()
 
                         # Show streaming response
                         placeholder = st.empty()
-                        full_response = ""
-
-                        for chunk in st.session_state.llm_client.plan_streaming(user_prompt, services_info):
-                            full_response += chunk
-                            placeholder.markdown(f"```json\n{full_response}\n```")
+                        full_response = stream_plan(st.session_state.llm_client, user_prompt, services_info, placeholder)
 
                         try:
-                            st.session_state.plan_result = json.loads(full_response)
+                            plan_result = _decode_plan(full_response)
+                            # Formatted once here rather than on every rerun that shows the plan
+                            st.session_state.plan_params_json = [
+                                _dumps_pretty(service_call.get('parameters'))
+                                for service_call in plan_result.get('services_to_call') or []
+                            ]
+                            st.session_state.plan_result = plan_result
                             st.markdown('<div class="success-box"><b>✅ Plan created successfully!</b></div>', unsafe_allow_html=True)
-                        except json.JSONDecodeError:
+                        except PlanDecodeError:
                             st.error("Failed to parse plan response")
 
         # Step 2: Execute
@@ -622,25 +1088,9 @@ else:
                         disabled=st.session_state.plan_result is None):
                 if st.session_state.plan_result:
                     with st.spinner("⏳ Executing services..."):
-                        services_to_call = st.session_state.plan_result.get('services_to_call', [])
-                        execution_results = {}
-
-                        for service_call in services_to_call:
-                            service_key = service_call.get('service_key')
-                            url = service_call.get('url')
-                            http_method = service_call.get('http_method', 'GET')
-
-                            st.write(f"🔄 Executing: {service_call.get('service_name')}")
-
-                            result = execute_api_call(url, http_method)
-                            execution_results[service_key] = result
-
-                            if result.get('success'):
-                                st.success(f"✅ {service_call.get('service_name')} completed")
-                            else:
-                                st.error(f"❌ {service_call.get('service_name')} failed: {result.get('error')}")
-
-                        st.session_state.execution_result = execution_results
+                        st.session_state.execution_result = execute_plan(
+                            st.session_state.plan_result.get('services_to_call') or []
+                        )
                         st.markdown('<div class="success-box"><b>✅ All services executed!</b></div>', unsafe_allow_html=True)
 
         # Step 3: Present
@@ -672,11 +1122,12 @@ else:
                 st.write(st.session_state.plan_result.get('reasoning', 'N/A'))
 
             st.write("**Services to Call:**")
-            for service_call in st.session_state.plan_result.get('services_to_call', []):
+            for service_call, params_json in zip(st.session_state.plan_result.get('services_to_call') or [],
+                                                 st.session_state.plan_params_json):
                 with st.expander(f"🔹 {service_call.get('service_name')} (Order: {service_call.get('order')})"):
                     st.write(f"**URL:** `{service_call.get('url')}`")
                     st.write(f"**Method:** {service_call.get('http_method')}")
-                    st.write(f"**Parameters:** {json.dumps(service_call.get('parameters'), indent=2)}")
+                    st.write(f"**Parameters:** {params_json}")
                     if service_call.get('depends_on'):
                         st.info(f"⚠️ Depends on: {service_call.get('depends_on')}")
 
@@ -101,6 +101,7 @@ passlib[bcrypt]==1.7.4
 structlog==23.2.0
 prometheus-client==0.19.0
 httpx==0.25.2
+orjson==3.9.10
 ```
 
 ### 2. requirements-dev.txt
@@ -130,6 +131,7 @@ class Settings(BaseSettings):
     
     # API
     API_V1_STR: str = "/api/v1"
+    ENABLE_GRAPHQL: bool = True  # REST-only deployments can skip loading strawberry and the schema
     SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
@@ -309,9 +311,10 @@ async def general_exception_handler(request: Request, exc: Exception):
 
 ### 7. app/services/cache.py
 ```python
+import asyncio
 import redis.asyncio as redis
-import json
-from typing import Any, Optional
+import orjson
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 from ..config.settings import settings
 from ..core.exceptions import CacheException
 import structlog
@@ -321,12 +324,14 @@ logger = structlog.get_logger(__name__)
 class CacheService:
     def __init__(self):
         self.redis = redis.from_url(settings.REDIS_URL, decode_responses=True)
+        # One lock per key being computed after a miss (see get_or_compute)
+        self._locks: Dict[str, asyncio.Lock] = {}
     
     async def get(self, key: str) -> Optional[Any]:
         try:
             value = await self.redis.get(key)
             if value:
-                return json.loads(value)
+                return orjson.loads(value)
             return None
         except Exception as e:
             logger.error("Cache get error", key=key, error=str(e))
@@ -335,13 +340,64 @@ class CacheService:
     async def set(self, key: str, value: Any, ttl: int = None) -> bool:
         try:
             ttl = ttl or settings.REDIS_CACHE_TTL
-            serialized_value = json.dumps(value, default=str)
+            serialized_value = orjson.dumps(value, default=str, option=orjson.OPT_NAIVE_UTC)
             await self.redis.setex(key, ttl, serialized_value)
             return True
         except Exception as e:
             logger.error("Cache set error", key=key, error=str(e))
             raise CacheException(f"Failed to set cache key: {key}")
     
+    async def mget(self, keys: List[str]) -> List[Optional[Any]]:
+        """Fetch several keys in one round trip; missing keys come back as None."""
+        if not keys:
+            return []
+        try:
+            values = await self.redis.mget(keys)
+            return [orjson.loads(value) if value else None for value in values]
+        except Exception as e:
+            logger.error("Cache mget error", keys=keys, error=str(e))
+            raise CacheException(f"Failed to get cache keys: {keys}")
+    
+    async def mset(self, mapping: Dict[str, Any], ttl: int = None) -> bool:
+        """Set several keys with the same TTL in one pipelined round trip."""
+        if not mapping:
+            return True
+        try:
+            ttl = ttl or settings.REDIS_CACHE_TTL
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key, value in mapping.items():
+                    pipe.setex(key, ttl, orjson.dumps(value, default=str, option=orjson.OPT_NAIVE_UTC))
+                await pipe.execute()
+            return True
+        except Exception as e:
+            logger.error("Cache mset error", keys=list(mapping), error=str(e))
+            raise CacheException(f"Failed to set cache keys: {list(mapping)}")
+    
+    async def get_or_compute(
+        self, key: str, compute: Callable[[], Awaitable[Any]], ttl: int = None
+    ) -> Any:
+        """
+        Return the cached value for key, computing and caching it on a miss.
+        Concurrent misses for the same key wait for a single compute() call
+        instead of each hitting the backing store (stampede protection).
+        """
+        value = await self.get(key)
+        if value is not None:
+            return value
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                # Whoever held the lock before us may have filled the cache already
+                value = await self.get(key)
+                if value is None:
+                    value = await compute()
+                    await self.set(key, value, ttl)
+        finally:
+            # Also on errors: keys come from client input, so stale locks must not pile up
+            if self._locks.get(key) is lock and not lock.locked():
+                del self._locks[key]
+        return value
+    
     async def delete(self, key: str) -> bool:
         try:
             result = await self.redis.delete(key)
@@ -376,9 +432,11 @@ class User(Base):
 ### 9. app/api/v1/endpoints/users.py
 ```python
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 import structlog
 
 from ...config.database import get_db
@@ -393,38 +451,50 @@ class UserCreate(BaseModel):
     full_name: str
 
 class UserResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
     id: int
     email: str
     full_name: str
     is_active: bool
+
+async def _fetch_users(db: AsyncSession, after_id: int, limit: int) -> List[dict]:
+    # Keyset pagination on the primary key (no OFFSET scan), selecting only the response columns
+    stmt = (
+        select(User.id, User.email, User.full_name, User.is_active)
+        .where(User.id > after_id)
+        .order_by(User.id)
+        .limit(limit)
+    )
+    result = await db.execute(stmt)
+    users = result.all()
     
-    class Config:
-        from_attributes = True
+    # One validate + dump per row; the same JSON-ready dicts are cached and returned
+    user_list = [
+        UserResponse.model_validate(user, from_attributes=True).model_dump(mode="json")
+        for user in users
+    ]
+    logger.info("Retrieved users from database", count=len(user_list))
+    return user_list
 
-@router.get("/users", response_model=List[UserResponse])
+# Rows are validated once in _fetch_users and cached as JSON-ready dicts, so the response
+# skips FastAPI's response_model re-validation; `responses` keeps the schema in OpenAPI.
+@router.get(
+    "/users",
+    response_model=None,
+    response_class=ORJSONResponse,
+    responses={200: {"model": List[UserResponse]}},
+)
 async def get_users(
-    skip: int = 0,
+    after_id: int = 0,
     limit: int = 100,
     db: AsyncSession = Depends(get_db)
 ):
-    cache_key = f"users:skip:{skip}:limit:{limit}"
-    cached_users = await cache_service.get(cache_key)
-    
-    if cached_users:
-        logger.info("Retrieved users from cache", count=len(cached_users))
-        return cached_users
-    
-    result = await db.execute(
-        "SELECT * FROM users LIMIT :limit OFFSET :skip",
-        {"limit": limit, "skip": skip}
-    )
-    users = result.fetchall()
-    
-    user_list = [UserResponse.from_orm(user) for user in users]
-    await cache_service.set(cache_key, [user.dict() for user in user_list])
-    
-    logger.info("Retrieved users from database", count=len(user_list))
-    return user_list
+    """List users with id > after_id; pass the last id of a page to get the next one."""
+    cache_key = f"users:after:{after_id}:limit:{limit}"
+    # Concurrent requests on a cold key share one database query
+    users = await cache_service.get_or_compute(cache_key, lambda: _fetch_users(db, after_id, limit))
+    return ORJSONResponse(users)
 
 @router.post("/users", response_model=UserResponse)
 async def create_user(
@@ -438,7 +508,7 @@ async def create_user(
         await db.refresh(db_user)
         
         logger.info("User created", user_id=db_user.id, email=user.email)
-        return UserResponse.from_orm(db_user)
+        return UserResponse.model_validate(db_user)
     except Exception as e:
         await db.rollback()
         logger.error("Failed to create user", error=str(e))
@@ -467,7 +537,6 @@ schema = strawberry.Schema(query=Query, mutation=Mutation)
 ```python
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from strawberry.fastapi import GraphQLRouter
 from contextlib import asynccontextmanager
 
 from .config.settings import settings
@@ -480,7 +549,6 @@ from .core.exceptions import (
     general_exception_handler
 )
 from .api.v1.router import api_router
-from .api.graphql.schema import schema
 from .services.cache import cache_service
 
 configure_logging()
@@ -516,9 +584,12 @@ app.add_exception_handler(Exception, general_exception_handler)
 # Routes
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
-# GraphQL
-graphql_app = GraphQLRouter(schema)
-app.include_router(graphql_app, prefix="/graphql")
+# GraphQL (imported only when enabled)
+if settings.ENABLE_GRAPHQL:
+    from strawberry.fastapi import GraphQLRouter
+    from .api.graphql.schema import schema
+
+    app.include_router(GraphQLRouter(schema), prefix="/graphql")
 
 @app.get("/health")
 async def health_check():
@@ -530,6 +601,8 @@ if __name__ == "__main__":
         "app.main:app",
         host="0.0.0.0",
         port=8000,
+        loop="uvloop",
+        http="httptools",
         reload=settings.DEBUG
     )
 ```
@@ -560,7 +633,11 @@ USER appuser
 
 EXPOSE 8000
 
-CMD ["uvicorn", "app.main:app", "--host", "0.0.0.0", "--port", "8000"]
+# uvicorn takes its default worker count from WEB_CONCURRENCY; override per deployment
+ENV WEB_CONCURRENCY=4
+
+# uvloop and httptools ship with uvicorn[standard]
+CMD ["uvicorn", "app.main:app", "--host", "0.0.0.0", "--port", "8000", "--loop", "uvloop", "--http", "httptools", "--proxy-headers"]
 ```
 
 #### docker/docker-compose.yml
@@ -704,6 +781,9 @@ LOG_FORMAT=json
 
 # CORS
 BACKEND_CORS_ORIGINS=["https://yourdomain.com"]
+
+# GraphQL
+ENABLE_GRAPHQL=true
 ```
 
 ### 15. Makefile